@@ -5,7 +5,17 @@ Main Flask application entry point
 from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from config import get_config
-from routes import metrics_bp, system_bp
+from routes import metrics_bp, system_bp, exposition_bp
+from engine import (
+    create_sampler,
+    create_history,
+    HISTORY_LAZY_FIELDS,
+    create_process_exchange,
+    create_responses,
+    create_demand,
+    OpenMetricsExposition,
+    SnapshotBroadcaster
+)
 import time
 import psutil
 import os
@@ -30,9 +40,34 @@ def create_app():
     # Setup CORS
     CORS(app, origins=config_obj.CORS_ORIGINS)
 
+    # Start background metric collection
+    history = create_history(config_obj)
+    # Recorded series must not depend on whether a client asked for their piece
+    demand = create_demand(config_obj, always=HISTORY_LAZY_FIELDS if history is not None else ())
+    sampler = create_sampler(config_obj, demand=demand)
+    if history is not None:
+        sampler.add_listener(history.append, scheduled_only=True)
+    broadcaster = SnapshotBroadcaster(
+        backlog=config_obj.STREAM_BACKLOG,
+        heartbeat_seconds=config_obj.STREAM_HEARTBEAT_SECONDS,
+        keyframe_interval=config_obj.DELTA_KEYFRAME_INTERVAL
+    )
+    sampler.add_subscriber(broadcaster.publish)
+    process_exchange = create_process_exchange(config_obj)
+    sampler.add_listener(process_exchange.publish)
+    sampler.start()
+    app.extensions['sampler'] = sampler
+    app.extensions['history'] = history
+    app.extensions['stream'] = broadcaster
+    app.extensions['processes'] = process_exchange
+    app.extensions['responses'] = create_responses(config_obj)
+    app.extensions['demand'] = demand
+    app.extensions['openmetrics'] = OpenMetricsExposition()
+
     # Register blueprints
     app.register_blueprint(metrics_bp)
     app.register_blueprint(system_bp)
+    app.register_blueprint(exposition_bp)
 
     # Store app start time
     app.config['START_TIME'] = time.time()
@@ -68,8 +103,11 @@ def create_app():
                         'memory': '/api/v1/metrics/memory',
                         'disk': '/api/v1/metrics/disk',
                         'network': '/api/v1/metrics/network',
-                        'all': '/api/v1/metrics/all'
-                    }
+                        'all': '/api/v1/metrics/all',
+                        'history': '/api/v1/metrics/history',
+                        'stream': '/api/v1/metrics/stream'
+                    },
+                    'openmetrics': '/metrics'
                 }
             }), 200
 
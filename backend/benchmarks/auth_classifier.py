@@ -0,0 +1,104 @@
+"""
+Auth log classifier benchmark
+Generates a synthetic auth.log and measures single-pass classification throughput.
+
+Usage (from backend/):
+    python -m benchmarks.auth_classifier --size-mb 1024
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from monitors.security_monitor import AuthEventStore, AuthLogTailer
+
+
+TEMPLATES = [
+    (40, 'sshd[{pid}]: Failed password for root from 203.0.113.{a} port {port} ssh2'),
+    (15, 'sshd[{pid}]: Invalid user admin{a} from 198.51.100.{b} port {port}'),
+    (10, 'sshd[{pid}]: Failed password for invalid user test{a} from 198.51.100.{b} port {port} ssh2'),
+    (5, 'sshd[{pid}]: Accepted publickey for pi from 192.168.1.{a} port {port} ssh2: ED25519 SHA256:abc'),
+    (120, 'CRON[{pid}]: pam_unix(cron:session): session opened for user root(uid=0) by (uid=0)'),
+    (120, 'CRON[{pid}]: pam_unix(cron:session): session closed for user root'),
+    (5, 'sudo:       pi : TTY=pts/0 ; PWD=/home/pi ; USER=root ; COMMAND=/usr/bin/systemctl restart pivitals'),
+    (60, 'sshd[{pid}]: Connection closed by authenticating user root 203.0.113.{a} port {port} [preauth]'),
+    (60, 'sshd[{pid}]: Received disconnect from 203.0.113.{a} port {port}:11: Bye Bye [preauth]'),
+    (40, 'systemd-logind[{pid}]: New session {port} of user pi.')
+]
+
+
+def generate(path, size_bytes, seed=1):
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in TEMPLATES]
+    templates = [template for _, template in TEMPLATES]
+    written = 0
+    lines = 0
+    with open(path, 'w') as log_file:
+        while written < size_bytes:
+            batch = []
+            for template in rng.choices(templates, weights, k=10000):
+                line = 'Oct {day:2d} {h:02d}:{m:02d}:{s:02d} raspberrypi '.format(
+                    day=rng.randint(1, 28), h=rng.randint(0, 23), m=rng.randint(0, 59), s=rng.randint(0, 59)
+                ) + template.format(
+                    pid=rng.randint(100, 65000), a=rng.randint(1, 254), b=rng.randint(1, 254),
+                    port=rng.randint(1024, 65535)
+                ) + '\n'
+                batch.append(line)
+            chunk = ''.join(batch)
+            log_file.write(chunk)
+            written += len(chunk)
+            lines += len(batch)
+    return lines
+
+
+def run(path):
+    store = AuthEventStore()
+    counted = [0]
+
+    def ingest(lines):
+        if lines is None:
+            store.clear()
+            return
+        counted[0] += len(lines)
+        store.ingest(lines)
+
+    tailer = AuthLogTailer([path], initial_bytes=os.path.getsize(path))
+    start = time.perf_counter()
+    error, _ = tailer.read_new(ingest)
+    elapsed = time.perf_counter() - start
+    if error:
+        raise SystemExit(error)
+    return counted[0], elapsed, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=1024, help='Synthetic log size (default: 1024)')
+    parser.add_argument('--path', help='Existing auth log to classify instead of a synthetic one')
+    args = parser.parse_args()
+
+    if args.path:
+        path = args.path
+        cleanup = False
+    else:
+        handle, path = tempfile.mkstemp(suffix='.auth.log')
+        os.close(handle)
+        cleanup = True
+        print(f"Generating {args.size_mb} MB synthetic auth log at {path}...")
+        generate(path, args.size_mb * 1024 * 1024)
+
+    try:
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        lines, elapsed, store = run(path)
+        print(f"Lines:        {lines:,}")
+        print(f"Size:         {size_mb:,.1f} MB")
+        print(f"Elapsed:      {elapsed:.2f} s")
+        print(f"Throughput:   {lines / elapsed:,.0f} lines/s ({size_mb / elapsed:,.1f} MB/s)")
+        print(f"Top IPs:      {store.top_ips(3)}")
+    finally:
+        if cleanup:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Process scanner benchmark
+Builds synthetic /proc trees and compares the direct /proc scanner with the
+psutil-based process table.
+
+Usage (from backend/):
+    python -m benchmarks.process_scan --counts 1000,5000,20000
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import psutil
+from monitors.proc_scanner import ProcScanner
+from monitors.process_monitor import ProcessTable
+
+
+MEMINFO = """MemTotal:        8000000 kB
+MemFree:         4000000 kB
+MemAvailable:    6000000 kB
+Buffers:          100000 kB
+Cached:          1500000 kB
+SwapCached:            0 kB
+Active:          2000000 kB
+Inactive:        1000000 kB
+SwapTotal:       1000000 kB
+SwapFree:        1000000 kB
+Shmem:             50000 kB
+SReclaimable:     100000 kB
+"""
+
+
+def build_procfs(root, count, seed=1):
+    """Write a minimal /proc tree with `count` processes that both scanners can read"""
+    rng = random.Random(seed)
+    boot_time = int(time.time()) - 86400
+    with open(os.path.join(root, 'stat'), 'w') as stat_file:
+        stat_file.write(f"cpu  100 0 100 1000 0 0 0 0 0 0\ncpu0 100 0 100 1000 0 0 0 0 0 0\nbtime {boot_time}\n")
+    with open(os.path.join(root, 'meminfo'), 'w') as meminfo:
+        meminfo.write(MEMINFO)
+    with open(os.path.join(root, 'uptime'), 'w') as uptime:
+        uptime.write('86400.00 80000.00\n')
+
+    uid = os.getuid()
+    for pid in range(1, count + 1):
+        directory = os.path.join(root, str(pid))
+        os.mkdir(directory)
+        utime, stime = rng.randint(0, 100000), rng.randint(0, 50000)
+        starttime = rng.randint(0, 8000000)
+        rss = rng.randint(100, 50000)
+        fields = ['S', '1', str(pid), str(pid), '0', '-1', '4194560', '0', '0', '0', '0',
+                  str(utime), str(stime), '0', '0', '20', '0', '1', '0', str(starttime),
+                  str(rss * 4096 * 4), str(rss)] + ['0'] * 30
+        with open(os.path.join(directory, 'stat'), 'w') as stat_file:
+            stat_file.write(f"{pid} (worker-{pid % 97}) {' '.join(fields)}\n")
+        with open(os.path.join(directory, 'statm'), 'w') as statm:
+            statm.write(f"{rss * 4} {rss} {rss // 2} 10 0 {rss} 0\n")
+        with open(os.path.join(directory, 'status'), 'w') as status:
+            status.write(f"Name:\tworker-{pid % 97}\nState:\tS (sleeping)\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\n"
+                         f"Gid:\t0\t0\t0\t0\n")
+
+
+def timed(func, repeat):
+    func()  # warm-up scan establishes the CPU baseline
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counts', default='1000,5000,20000', help='Comma-separated process counts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed scans per scanner (default: 5)')
+    args = parser.parse_args()
+
+    print(f"{'processes':>10} {'psutil (ms)':>12} {'/proc (ms)':>11} {'speedup':>8}")
+    for count in [int(value) for value in args.counts.split(',')]:
+        root = tempfile.mkdtemp(prefix='pivitals-proc-')
+        try:
+            build_procfs(root, count)
+
+            psutil.PROCFS_PATH = root
+            table = ProcessTable()
+            psutil_time = timed(table.update, args.repeat)
+            psutil.PROCFS_PATH = '/proc'
+
+            scanner = ProcScanner(root)
+            proc_time = timed(lambda: scanner.scan(limit=10), args.repeat)
+
+            print(f"{count:>10} {psutil_time * 1000:>12.1f} {proc_time * 1000:>11.1f} {psutil_time / proc_time:>7.1f}x")
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,30 @@
 Configuration settings for PiVitals backend
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def parse_collector_ttls(value):
+    """Parse 'name:seconds,...' pairs, skipping malformed or non-positive entries"""
+    ttls = {}
+    for pair in value.split(','):
+        if not pair.strip():
+            continue
+        name, _, seconds = pair.partition(':')
+        try:
+            ttl = float(seconds)
+        except ValueError:
+            ttl = None
+        if not name.strip() or ttl is None or not ttl > 0:
+            print(f"Warning: ignoring COLLECTOR_TTLS entry {pair.strip()!r}; expected name:seconds with seconds > 0")
+            continue
+        ttls[name.strip()] = ttl
+    return ttls
+
+
 class Config:
     """Base configuration"""
 
@@ -23,18 +42,81 @@ class Config:
     APP_VERSION = '1.0.0'
     METRICS_CACHE_SECONDS = int(os.getenv('METRICS_CACHE_SECONDS', 1))
 
+    # Background sampler settings
+    SAMPLER_INTERVAL_SECONDS = float(os.getenv('SAMPLER_INTERVAL_SECONDS', METRICS_CACHE_SECONDS))
+    SAMPLER_STARTUP_TIMEOUT = float(os.getenv('SAMPLER_STARTUP_TIMEOUT', 5))
+    # Per-collector refresh TTLs as name:seconds pairs (e.g. 'cpu:1,memory:2,disk:10'); unlisted
+    # collectors keep SAMPLER_INTERVAL_SECONDS, PROCESS_SAMPLE_SECONDS or SYSTEM_CACHE_SECONDS
+    COLLECTOR_TTLS = parse_collector_ttls(os.getenv('COLLECTOR_TTLS', ''))
+    # Per-collector deadline within a tick; slower collectors publish their last value marked stale
+    COLLECTOR_TIMEOUT_SECONDS = float(os.getenv('COLLECTOR_TIMEOUT_SECONDS', 2))
+    # EWMA time constant for per-interface network rates (0 disables smoothing)
+    NETWORK_RATE_SMOOTHING_SECONDS = float(os.getenv('NETWORK_RATE_SMOOTHING_SECONDS', 2))
+    # Filesystem usage: per-collection statvfs deadline, pool size, and backoff cap for stale mounts
+    DISK_USAGE_TIMEOUT = float(os.getenv('DISK_USAGE_TIMEOUT', 1))
+    DISK_USAGE_WORKERS = int(os.getenv('DISK_USAGE_WORKERS', 4))
+    DISK_USAGE_MAX_BACKOFF = float(os.getenv('DISK_USAGE_MAX_BACKOFF', 300))
+
+    # Cross-worker snapshot sharing (one elected worker samples, the rest read)
+    SHARED_SNAPSHOT_ENABLED = os.getenv('SHARED_SNAPSHOT_ENABLED', 'true').lower() == 'true'
+    SHARED_SNAPSHOT_PATH = os.getenv(
+        'SHARED_SNAPSHOT_PATH',
+        os.path.join(
+            '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+            f"pivitals-{os.getenv('FLASK_PORT', 5001)}.snapshot"
+        )
+    )
+    SHARED_SNAPSHOT_BYTES = int(os.getenv('SHARED_SNAPSHOT_BYTES', 8 * 1024 * 1024))
+
+    # Snapshot endpoint responses: encoded once per tick, gzip-compressed for clients that accept it
+    RESPONSE_GZIP_ENABLED = os.getenv('RESPONSE_GZIP_ENABLED', 'true').lower() == 'true'
+    RESPONSE_GZIP_MIN_BYTES = int(os.getenv('RESPONSE_GZIP_MIN_BYTES', 1024))
+
+    # Seconds since the last request for an optional piece (network connections and addresses)
+    # after which the sampler stops collecting it
+    LAZY_COLLECTOR_TTL_SECONDS = float(os.getenv('LAZY_COLLECTOR_TTL_SECONDS', 30))
+
+    # Server-Sent Events streaming
+    STREAM_HEARTBEAT_SECONDS = int(os.getenv('STREAM_HEARTBEAT_SECONDS', 15))
+    STREAM_BACKLOG = int(os.getenv('STREAM_BACKLOG', 120))
+    DELTA_KEYFRAME_INTERVAL = int(os.getenv('DELTA_KEYFRAME_INTERVAL', 30))
+
+    # Persistent metric history
+    HISTORY_ENABLED = os.getenv('HISTORY_ENABLED', 'true').lower() == 'true'
+    HISTORY_PATH = os.getenv(
+        'HISTORY_PATH',
+        os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'history.bin'))
+    )
+    HISTORY_RETENTION_SECONDS = int(os.getenv('HISTORY_RETENTION_SECONDS', 14 * 86400))
+    HISTORY_FLUSH_SECONDS = int(os.getenv('HISTORY_FLUSH_SECONDS', 60))
+    # Rollup tiers as width:retention pairs in seconds (10 s for 30 days, 1 min for 180 days, 1 h for 5 years)
+    HISTORY_ROLLUPS = [
+        tuple(int(part) for part in tier.split(':'))
+        for tier in os.getenv('HISTORY_ROLLUPS', '10:2592000,60:15552000,3600:157680000').split(',')
+        if tier.strip()
+    ]
+
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
     # System monitoring settings
     SYSTEM_CACHE_SECONDS = int(os.getenv('SYSTEM_CACHE_SECONDS', 5))
     SYSTEM_PROCESS_LIMIT = int(os.getenv('SYSTEM_PROCESS_LIMIT', 10))
+    # The process table is refreshed by the sampler; CPU% covers the time between refreshes
+    PROCESS_SAMPLE_SECONDS = float(os.getenv('PROCESS_SAMPLE_SECONDS', SAMPLER_INTERVAL_SECONDS))
+    # 'psutil' or 'proc' (direct /proc scanner, faster with thousands of processes)
+    PROCESS_SCANNER = os.getenv('PROCESS_SCANNER', 'psutil').lower()
     SYSTEM_SERVICE_LIMIT = int(os.getenv('SYSTEM_SERVICE_LIMIT', 15))
     SYSTEM_SECURITY_LIMIT = int(os.getenv('SYSTEM_SECURITY_LIMIT', 10))
     WATCHED_SERVICES = [
         name.strip() for name in os.getenv('WATCHED_SERVICES', 'pivitals,ssh').split(',')
         if name.strip()
     ]
+    # cgroup v2 mount used for per-service CPU/memory/IO accounting
+    SERVICE_CGROUP_ROOT = os.getenv('SERVICE_CGROUP_ROOT', '/sys/fs/cgroup')
+    # Track unit states from systemd D-Bus signals ('SYSTEM' or a bus address); systemctl is the fallback
+    SERVICE_DBUS_ENABLED = os.getenv('SERVICE_DBUS_ENABLED', 'true').lower() == 'true'
+    SERVICE_DBUS_BUS = os.getenv('SERVICE_DBUS_BUS', 'SYSTEM')
 
 
 class DevelopmentConfig(Config):
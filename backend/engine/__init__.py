@@ -0,0 +1,40 @@
+"""
+Engine modules for background collection and snapshot publishing
+"""
+from .sampler import Sampler, Snapshot, create_sampler
+from .history import HISTORY_LAZY_FIELDS, HistoryStore, create_history
+from .stream import SnapshotBroadcaster, metrics_payload
+from .delta import DeltaEncoder, diff
+from .processes import PROCESS_SORT_KEYS, ProcessIndex, ProcessTableExchange, create_process_exchange
+from .responses import SNAPSHOT_VIEWS, SnapshotResponses, create_responses, parse_fields, snapshot_etag, snapshot_fields
+from .demand import LAZY_FIELDS, CollectorDemand, create_demand
+from .openmetrics import CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE, OpenMetricsExposition, render_openmetrics
+
+__all__ = [
+    'Sampler',
+    'Snapshot',
+    'create_sampler',
+    'HISTORY_LAZY_FIELDS',
+    'HistoryStore',
+    'create_history',
+    'SnapshotBroadcaster',
+    'metrics_payload',
+    'DeltaEncoder',
+    'diff',
+    'PROCESS_SORT_KEYS',
+    'ProcessIndex',
+    'ProcessTableExchange',
+    'create_process_exchange',
+    'SNAPSHOT_VIEWS',
+    'SnapshotResponses',
+    'create_responses',
+    'parse_fields',
+    'snapshot_etag',
+    'snapshot_fields',
+    'LAZY_FIELDS',
+    'CollectorDemand',
+    'create_demand',
+    'OPENMETRICS_CONTENT_TYPE',
+    'OpenMetricsExposition',
+    'render_openmetrics'
+]
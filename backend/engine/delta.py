@@ -0,0 +1,109 @@
+"""
+Delta encoding
+Compact JSON-patch-like diffs between consecutive snapshot payloads
+"""
+import json
+import threading
+from collections import OrderedDict
+
+
+def _escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def diff(old, new, path='', ops=None):
+    """
+    List the changed leaves between two JSON-compatible values.
+    Each op is [path, value] to set a value or [path] to remove it, where path is
+    a JSON Pointer. Dicts and equal-length lists are compared element-wise;
+    anything else that differs is replaced whole.
+    """
+    if ops is None:
+        ops = []
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                diff(old[key], value, child, ops)
+            else:
+                ops.append([child, value])
+        for key in old:
+            if key not in new:
+                ops.append([f"{path}/{_escape(key)}"])
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            diff(old_item, new_item, f"{path}/{index}", ops)
+    elif type(old) is not type(new) or old != new:
+        ops.append([path, new])
+    return ops
+
+
+class DeltaEncoder:
+    """
+    Keeps the payloads of the current keyframe period and encodes the latest one
+    relative to a client's last known sequence number.
+
+    A client gets a full keyframe when its base is unknown or belongs to an
+    earlier keyframe period (every `keyframe_interval` sequence numbers), so all
+    clients resync periodically. Encoded messages are cached per base for the
+    latest snapshot, so clients that are in step share one serialization.
+    """
+
+    def __init__(self, payload_builder, keyframe_interval=30):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._build = payload_builder
+        self._payloads = OrderedDict()
+        self._messages = {}
+        self._latest = None
+        self._lock = threading.Lock()
+
+    def record(self, snapshot):
+        """Sampler subscriber"""
+        payload = self._build(snapshot)
+        with self._lock:
+            self._payloads[snapshot.seq] = payload
+            while len(self._payloads) > self.keyframe_interval:
+                self._payloads.popitem(last=False)
+            self._latest = snapshot.seq
+            self._messages = {}
+
+    @property
+    def latest_seq(self):
+        return self._latest
+
+    def _is_keyframe(self, base, seq):
+        return (
+            base is None
+            or base not in self._payloads
+            or base > seq
+            or base // self.keyframe_interval != seq // self.keyframe_interval
+        )
+
+    def encode(self, base):
+        """
+        Return (seq, kind, JSON text) for the latest payload relative to base, where
+        kind is 'keyframe' or 'patch'; None if nothing has been recorded yet.
+        """
+        with self._lock:
+            seq = self._latest
+            if seq is None:
+                return None
+            if self._is_keyframe(base, seq):
+                base = None
+            cached = self._messages.get(base)
+            if cached is not None:
+                return cached
+
+            payload = self._payloads[seq]
+            if base is None:
+                message = (seq, 'keyframe', json.dumps(payload, separators=(',', ':')))
+            else:
+                previous = {key: value for key, value in self._payloads[base].items() if key != 'seq'}
+                current = {key: value for key, value in payload.items() if key != 'seq'}
+                message = (seq, 'patch', json.dumps({
+                    'seq': seq,
+                    'base': base,
+                    'patch': diff(previous, current)
+                }, separators=(',', ':')))
+            self._messages[base] = message
+            return message
@@ -0,0 +1,91 @@
+"""
+Collector demand
+Tracks which optional sub-collectors clients asked for recently, across workers
+"""
+import os
+import threading
+import time
+
+
+# Expensive parts of the snapshot, collected only while someone asks for them
+LAZY_FIELDS = ('network.connections', 'network.addresses')
+
+# Minimum seconds between two demand records of one piece by one worker
+TOUCH_INTERVAL = 1.0
+
+
+def covers(field, piece):
+    """Whether a response limited to field includes piece, or part of it"""
+    return field == piece or piece.startswith(field + '.') or field.startswith(piece + '.')
+
+
+class CollectorDemand:
+    """
+    When each lazy piece was last asked for.
+    With a path, a request is recorded as the mtime of one marker file per
+    piece, so the worker that collects sees demand from requests served by any
+    worker; each worker touches a marker at most once per TOUCH_INTERVAL. A
+    piece nobody asked for within `ttl` seconds is skipped until someone does.
+    Everything counts as wanted for the first `ttl` seconds after start, and
+    pieces in `always` (read by the sampler's own listeners) at all times.
+    """
+
+    def __init__(self, pieces=LAZY_FIELDS, path=None, ttl=30.0, always=()):
+        self.pieces = tuple(pieces)
+        self.path = path
+        self.ttl = ttl
+        self.always = frozenset(always)
+        self._requested = {}
+        self._lock = threading.Lock()
+        self.request()
+
+    def _marker(self, piece):
+        return f'{self.path}.demand-{piece}'
+
+    def _touch(self, piece):
+        marker = self._marker(piece)
+        try:
+            os.utime(marker)
+        except FileNotFoundError:
+            os.close(os.open(marker, os.O_WRONLY | os.O_CREAT, 0o600))
+
+    def request(self, fields=None):
+        """
+        Record demand for the pieces included in a response limited to these
+        snapshot paths (dotted, e.g. 'network.connections'); None means everything
+        """
+        now = time.time()
+        for piece in self.pieces:
+            if fields is not None and not any(covers(field, piece) for field in fields):
+                continue
+            with self._lock:
+                if now - self._requested.get(piece, 0.0) < TOUCH_INTERVAL:
+                    continue
+                self._requested[piece] = now
+            if self.path is not None:
+                try:
+                    self._touch(piece)
+                except OSError:
+                    pass
+
+    def wanted(self, piece):
+        """Whether piece was asked for within the last `ttl` seconds"""
+        if piece in self.always:
+            return True
+        if self.path is None:
+            requested = self._requested.get(piece, 0.0)
+        else:
+            try:
+                requested = os.stat(self._marker(piece)).st_mtime
+            except OSError:
+                return False
+        return time.time() - requested < self.ttl
+
+
+def create_demand(config, always=()):
+    """Build the collector demand tracker from a configuration object"""
+    return CollectorDemand(
+        path=config.SHARED_SNAPSHOT_PATH if config.SHARED_SNAPSHOT_ENABLED else None,
+        ttl=config.LAZY_COLLECTOR_TTL_SECONDS,
+        always=always
+    )
@@ -0,0 +1,569 @@
+"""
+Persistent metric history
+Fixed-width binary ring files that the sampler leader appends to and every
+worker reads through a shared memory mapping. Besides the raw tier, coarser
+rollup tiers keep min/max/avg/count per bucket for long-range queries.
+"""
+import atexit
+import fcntl
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+
+MAGIC = b'PIVH'
+VERSION = 1
+PAGE_SIZE = 4096
+HEADER_SIZE = PAGE_SIZE
+
+# Raw record: float64 unix timestamp + one float32 per series, 64 bytes in total,
+# so exactly 64 records fill a 4 KiB page.
+SERIES_SLOTS = 14
+RECORD = struct.Struct(f'<d{SERIES_SLOTS}f')
+
+# Rollup record: bucket start + (min, max, avg, count) per series, padded to 256
+# bytes so 16 records fill a page.
+ROLLUP_RECORD = struct.Struct('<d' + 'fffI' * SERIES_SLOTS + '24x')
+
+# (bucket width, retention) in seconds
+DEFAULT_ROLLUPS = [
+    (10, 30 * 86400),
+    (60, 180 * 86400),
+    (3600, 5 * 365 * 86400)
+]
+
+_TIMESTAMP = struct.Struct('<d')
+_VALUE = struct.Struct('<f')
+_AGGREGATE = struct.Struct('<fffI')
+_HEADER = struct.Struct('<4sIIQI')
+
+
+def _path_value(metrics, path):
+    value = metrics
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _root_partition_percent(metrics):
+    for partition in (metrics.get('disk') or {}).get('partitions', []):
+        if partition.get('mountpoint') == '/':
+            return partition.get('percent')
+    return None
+
+
+def _network_total(field):
+    def extract(metrics):
+        interfaces = (metrics.get('network') or {}).get('interfaces') or {}
+        values = [stats.get(field) for name, stats in interfaces.items() if name != 'lo']
+        values = [value for value in values if value is not None]
+        return sum(values) if values else None
+    return extract
+
+
+def _path(path):
+    return lambda metrics: _path_value(metrics, path)
+
+
+# (series name, extractor, is_counter). Counters are stored as per-second rates
+# because float32 cannot hold cumulative byte counts precisely.
+HISTORY_SERIES = [
+    ('cpu.usage_percent', _path('cpu.usage_percent'), False),
+    ('cpu.temperature', _path('cpu.temperature'), False),
+    ('cpu.frequency', _path('cpu.frequency.current'), False),
+    ('cpu.iowait_percent', _path('cpu.breakdown.iowait'), False),
+    ('memory.percent', _path('memory.percent'), False),
+    ('memory.used', _path('memory.used'), False),
+    ('memory.swap_percent', _path('memory.swap.percent'), False),
+    ('disk.root_percent', _root_partition_percent, False),
+    ('disk.read_bytes_per_sec', _path('disk.io_counters.read_bytes'), True),
+    ('disk.write_bytes_per_sec', _path('disk.io_counters.write_bytes'), True),
+    ('network.recv_bytes_per_sec', _network_total('bytes_recv'), True),
+    ('network.sent_bytes_per_sec', _network_total('bytes_sent'), True),
+    ('network.established', _path('network.connections.established'), False),
+    ('processes.total', _path('processes.summary.total_processes'), False)
+]
+
+# Lazy snapshot pieces (see engine.demand) that HISTORY_SERIES read
+HISTORY_LAZY_FIELDS = ('network.connections',)
+
+
+class RingFile:
+    """
+    Ring buffer of fixed-width records in a preallocated (sparse) file.
+
+    Records are kept in memory until they complete a 4 KiB page (or the flush
+    interval passes) and are then written with one aligned pwrite, so each page
+    on the SD card is normally written once. Timestamps are strictly increasing,
+    which lets the write position be recovered on open by binary search instead
+    of persisting a head pointer.
+
+    A file with another layout (series, retention or interval changed) is only
+    moved aside by the writer, on its first append; readers see no records
+    until then, and reopen once the file at path has been replaced.
+    """
+
+    def __init__(self, path, record, retention_records, names, flush_seconds=60):
+        self.path = path
+        self.record_size = record.size
+        self.records_per_page = PAGE_SIZE // record.size
+        pages = max(1, math.ceil(retention_records / self.records_per_page))
+        self.capacity = pages * self.records_per_page
+        self.flush_seconds = flush_seconds
+        self._names = names
+
+        self._buffer = []
+        self._head = None
+        self._last_timestamp = 0.0
+        self._last_flush = time.monotonic()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = None
+        self._map = None
+        self._reopen(migrate=False)
+
+    def _header(self):
+        names = json.dumps(self._names).encode('utf-8')
+        header = _HEADER.pack(MAGIC, VERSION, self.record_size, self.capacity, len(names)) + names
+        return header.ljust(HEADER_SIZE, b'\0')
+
+    def _prepare(self, fd, migrate):
+        """With fd locked: True if it holds our layout, False if not, None to reopen"""
+        try:
+            if os.fstat(fd).st_ino != os.stat(self.path).st_ino:
+                # Moved aside by the writer while we waited for the lock
+                return None
+        except FileNotFoundError:
+            return None
+        expected = self._header()
+        size = HEADER_SIZE + self.capacity * self.record_size
+        current = os.pread(fd, HEADER_SIZE, 0)
+        if current == expected:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            return True
+        if any(current):
+            if not migrate:
+                return False
+            # Layout changed (series, retention or interval); keep the old file aside
+            os.replace(self.path, self.path + '.old')
+            return None
+        os.ftruncate(fd, size)
+        os.pwrite(fd, expected, 0)
+        return True
+
+    def _open(self, migrate):
+        """(fd, whether it holds our layout) for the file currently at path"""
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            prepared = None
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                prepared = self._prepare(fd, migrate)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                if prepared is None:
+                    os.close(fd)
+            if prepared is not None:
+                return fd, prepared
+
+    def _reopen(self, migrate):
+        fd, compatible = self._open(migrate)
+        if self._map is not None:
+            self._map.close()
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = fd
+        self._map = mmap.mmap(
+            fd, HEADER_SIZE + self.capacity * self.record_size, prot=mmap.PROT_READ
+        ) if compatible else None
+
+    def _current(self, migrate):
+        """Reopen if our file has another layout or is no longer the one at path"""
+        if self._map is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self._fd).st_ino:
+                    return
+            except FileNotFoundError:
+                pass
+        self._reopen(migrate)
+
+    def offset(self, slot):
+        return HEADER_SIZE + slot * self.record_size
+
+    def _timestamp_at(self, slot):
+        return _TIMESTAMP.unpack_from(self._map, self.offset(slot))[0]
+
+    def _find_head(self):
+        """Slot holding the oldest record (equivalently, the next slot to write)"""
+        low, high = 0, self.capacity - 1
+        while low < high:
+            mid = (low + high) // 2
+            if self._timestamp_at(mid) > self._timestamp_at(high):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def span(self):
+        """(oldest slot, record count) of what is on disk"""
+        if self._map is None:
+            return 0, 0
+        head = self._find_head()
+        if self._timestamp_at(head) == 0.0:
+            return 0, head
+        return head, self.capacity
+
+    @property
+    def last_timestamp(self):
+        """Newest timestamp written or buffered by this process (writer side)"""
+        self._ensure_head()
+        return self._last_timestamp
+
+    def _ensure_head(self):
+        if self._head is not None:
+            return
+        self._current(migrate=True)
+        oldest, count = self.span()
+        self._head = count % self.capacity if count < self.capacity else oldest
+        if count:
+            self._last_timestamp = self._timestamp_at((self._head - 1) % self.capacity)
+
+    def append(self, timestamp, packed):
+        """Buffer one packed record; returns False if timestamp is not increasing"""
+        self._ensure_head()
+        if timestamp <= self._last_timestamp:
+            return False
+        self._last_timestamp = timestamp
+        self._buffer.append(packed)
+
+        page_complete = (self._head + len(self._buffer)) % self.records_per_page == 0
+        if page_complete or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+        return True
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer or self._head is None:
+            return
+        records = self._buffer
+        self._buffer = []
+        while records:
+            chunk = records[:self.capacity - self._head]
+            records = records[len(chunk):]
+            os.pwrite(self._fd, b''.join(chunk), self.offset(self._head))
+            self._head = (self._head + len(chunk)) % self.capacity
+
+    def _bisect(self, oldest, count, timestamp, inclusive=False):
+        """First logical index whose timestamp is >= timestamp (> if inclusive)"""
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            current = self._timestamp_at((oldest + mid) % self.capacity)
+            if current < timestamp or (inclusive and current == timestamp):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def range_offsets(self, start, end):
+        """Byte offsets in the mapping of every record with start <= timestamp <= end"""
+        if self._head is None:
+            self._current(migrate=False)
+        oldest, count = self.span()
+        first = self._bisect(oldest, count, start)
+        last = self._bisect(oldest, count, end, inclusive=True)
+        return [self.offset((oldest + index) % self.capacity) for index in range(first, last)]
+
+    def range_records(self, start, end):
+        """(buffer, offset) of every record with start <= timestamp <= end, including unflushed ones"""
+        records = [(self._map, base) for base in self.range_offsets(start, end)]
+        records.extend(
+            (packed, 0) for packed in self._buffer if start <= _TIMESTAMP.unpack_from(packed)[0] <= end
+        )
+        return records
+
+    def read_timestamp(self, base):
+        return _TIMESTAMP.unpack_from(self._map, base)[0]
+
+    def read(self, struct_type, base):
+        return struct_type.unpack_from(self._map, base)
+
+    def close(self):
+        self.flush()
+        if self._map is not None:
+            self._map.close()
+        os.close(self._fd)
+
+
+class RollupTier:
+    """Incrementally aggregates raw samples into fixed-width buckets"""
+
+    def __init__(self, width, ring, series_count):
+        self.width = width
+        self.ring = ring
+        self._series_count = series_count
+        self._bucket = None
+        self._reset()
+
+    def _reset(self):
+        count = self._series_count
+        self._mins = [math.inf] * count
+        self._maxs = [-math.inf] * count
+        self._sums = [0.0] * count
+        self._counts = [0] * count
+
+    def add(self, timestamp, values):
+        bucket = timestamp - timestamp % self.width
+        if bucket != self._bucket:
+            self._emit()
+            self._bucket = bucket
+        for index in range(self._series_count):
+            value = values[index]
+            if math.isnan(value):
+                continue
+            if value < self._mins[index]:
+                self._mins[index] = value
+            if value > self._maxs[index]:
+                self._maxs[index] = value
+            self._sums[index] += value
+            self._counts[index] += 1
+
+    def _emit(self):
+        if self._bucket is None or not any(self._counts):
+            self._reset()
+            return
+        fields = []
+        for index in range(SERIES_SLOTS):
+            count = self._counts[index] if index < self._series_count else 0
+            if count:
+                fields.extend((
+                    self._mins[index],
+                    self._maxs[index],
+                    self._sums[index] / count,
+                    count
+                ))
+            else:
+                fields.extend((math.nan, math.nan, math.nan, 0))
+        self.ring.append(self._bucket, ROLLUP_RECORD.pack(self._bucket, *fields))
+        self._reset()
+
+
+def _rollup_path(path, width):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{width}s{ext or '.bin'}"
+
+
+def _merge_rows(rows, points):
+    """Aggregate consecutive rows so that at most `points` remain; returns (rows, group size)"""
+    group = math.ceil(len(rows) / points) if points else 1
+    if group <= 1:
+        return rows, 1
+    merged = []
+    for start in range(0, len(rows), group):
+        chunk = rows[start:start + group]
+        present = [row for row in chunk if row[4]]
+        if not present:
+            merged.append([chunk[0][0], None, None, None, 0])
+            continue
+        count = sum(row[4] for row in present)
+        merged.append([
+            chunk[0][0],
+            round(sum(row[1] * row[4] for row in present) / count, 3),
+            min(row[2] for row in present),
+            max(row[3] for row in present),
+            count
+        ])
+    return merged, group
+
+
+def _clean(value):
+    return None if math.isnan(value) else round(value, 3)
+
+
+class HistoryStore:
+    """
+    Raw sample ring plus rollup tiers (10 s, 1 min, 1 h by default).
+    Every tier is updated incrementally as samples arrive; queries read the
+    coarsest tier that still yields the requested number of points.
+    """
+
+    def __init__(self, path, retention_seconds, interval, flush_seconds=60,
+                 rollups=DEFAULT_ROLLUPS, series=HISTORY_SERIES):
+        if len(series) > SERIES_SLOTS:
+            raise ValueError(f'At most {SERIES_SLOTS} history series are supported')
+        self.path = path
+        self.interval = interval
+        self.series = series
+        self.names = [name for name, _, _ in series]
+        self._columns = {name: index for index, name in enumerate(self.names)}
+        self._lock = threading.Lock()
+        self._previous_counters = {}
+        self._seeded = False
+
+        self._raw = RingFile(path, RECORD, retention_seconds / interval, self.names, flush_seconds)
+        self._tiers = [
+            RollupTier(width, RingFile(
+                _rollup_path(path, width),
+                ROLLUP_RECORD,
+                tier_retention / width,
+                self.names,
+                flush_seconds
+            ), len(self.names))
+            for width, tier_retention in sorted(rollups)
+            if width > interval
+        ]
+        atexit.register(self.flush)
+
+    @property
+    def resolutions(self):
+        return [self.interval] + [tier.width for tier in self._tiers]
+
+    def _record_values(self, metrics, timestamp):
+        values = []
+        for name, extract, is_counter in self.series:
+            try:
+                value = extract(metrics)
+            except Exception:
+                value = None
+            if is_counter and value is not None:
+                previous = self._previous_counters.get(name)
+                self._previous_counters[name] = (timestamp, value)
+                if previous is None or timestamp <= previous[0] or value < previous[1]:
+                    value = None
+                else:
+                    value = (value - previous[1]) / (timestamp - previous[0])
+            values.append(math.nan if value is None else float(value))
+        values.extend([math.nan] * (SERIES_SLOTS - len(values)))
+        return values
+
+    def _seed_tiers(self, timestamp):
+        """
+        Replay raw records written before a restart into the rollups, from the
+        first bucket a tier has not stored yet. Buckets the downtime closed are
+        emitted on the way; the one holding timestamp stays in progress.
+        """
+        self._seeded = True
+        for tier in self._tiers:
+            if tier.ring.last_timestamp:
+                start = tier.ring.last_timestamp + tier.width
+            else:
+                last = self._raw.last_timestamp
+                start = last - last % tier.width
+            for base in self._raw.range_offsets(start, timestamp):
+                record = self._raw.read(RECORD, base)
+                tier.add(record[0], record[1:])
+
+    def append(self, snapshot):
+        """Sampler listener: record one tick in the raw tier and every rollup"""
+        with self._lock:
+            timestamp = snapshot.timestamp
+            values = self._record_values(snapshot.metrics, timestamp)
+            if not self._seeded:
+                self._seed_tiers(timestamp)
+            if not self._raw.append(timestamp, RECORD.pack(timestamp, *values)):
+                # Wall clock stepped backwards; keep the files strictly ordered
+                return
+            # Rollups are fed with float32-rounded values, same as the raw tier
+            stored = RECORD.unpack(RECORD.pack(timestamp, *values))[1:]
+            for tier in self._tiers:
+                tier.add(timestamp, stored)
+
+    def flush(self):
+        with self._lock:
+            self._raw.flush()
+            for tier in self._tiers:
+                tier.ring.flush()
+
+    def _select(self, start, end, points):
+        """
+        Coarsest tier that still gives at least `points` rows over the range
+        (None for the raw ring), or if its retention no longer reaches back to
+        start, the finest one whose retention does.
+        """
+        span = max(end - start, 0)
+        levels = [None] + self._tiers
+        retentions = [self._raw.capacity * self.interval] + [tier.ring.capacity * tier.width for tier in self._tiers]
+        index = 0
+        for candidate in range(len(levels) - 1, 0, -1):
+            if span / levels[candidate].width >= points:
+                index = candidate
+                break
+        age = time.time() - start
+        while index < len(levels) - 1 and retentions[index] < age:
+            index += 1
+        return levels[index]
+
+    def query(self, metric, start, end, points=500):
+        """
+        Return (resolution, rows) for start <= timestamp <= end, where each row is
+        [timestamp, avg, min, max, count]. Rows beyond `points` are merged.
+        The writer also serves records it has not flushed yet; other workers
+        only see what is on disk, up to flush_seconds behind.
+        """
+        column = self._columns.get(metric)
+        if column is None:
+            raise KeyError(metric)
+
+        tier = self._select(start, end, points)
+        rows = []
+        # The lock keeps the writer from flushing (or a reader from remapping) mid-read
+        with self._lock:
+            if tier is None:
+                resolution = self.interval
+                value_offset = 8 + column * _VALUE.size
+                for buffer, base in self._raw.range_records(start, end):
+                    value = _clean(_VALUE.unpack_from(buffer, base + value_offset)[0])
+                    rows.append([
+                        _TIMESTAMP.unpack_from(buffer, base)[0],
+                        value,
+                        value,
+                        value,
+                        0 if value is None else 1
+                    ])
+            else:
+                resolution = tier.width
+                value_offset = 8 + column * _AGGREGATE.size
+                for buffer, base in tier.ring.range_records(start, end):
+                    low, high, avg, count = _AGGREGATE.unpack_from(buffer, base + value_offset)
+                    rows.append([
+                        _TIMESTAMP.unpack_from(buffer, base)[0],
+                        _clean(avg),
+                        _clean(low),
+                        _clean(high),
+                        count
+                    ])
+
+        rows, group = _merge_rows(rows, points)
+        return resolution * group, rows
+
+    def close(self):
+        self.flush()
+        self._raw.close()
+        for tier in self._tiers:
+            tier.ring.close()
+
+
+def create_history(config):
+    """Build the history store from a configuration object (None if disabled)"""
+    if not config.HISTORY_ENABLED:
+        return None
+    try:
+        return HistoryStore(
+            config.HISTORY_PATH,
+            retention_seconds=config.HISTORY_RETENTION_SECONDS,
+            interval=config.SAMPLER_INTERVAL_SECONDS,
+            flush_seconds=config.HISTORY_FLUSH_SECONDS,
+            rollups=config.HISTORY_ROLLUPS
+        )
+    except OSError as e:
+        print(f"Warning: metric history unavailable ({e})")
+        return None
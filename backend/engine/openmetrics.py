@@ -0,0 +1,182 @@
+"""
+OpenMetrics exposition
+Renders the sampler snapshot in the OpenMetrics text format for Prometheus
+"""
+import threading
+
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+SERVICE_STATES = ('active', 'inactive', 'failed', 'activating', 'deactivating')
+
+# Interface counter -> (metric family, help)
+INTERFACE_COUNTERS = {
+    'bytes_recv': ('pivitals_network_receive_bytes', 'Bytes received'),
+    'bytes_sent': ('pivitals_network_transmit_bytes', 'Bytes transmitted'),
+    'packets_recv': ('pivitals_network_receive_packets', 'Packets received'),
+    'packets_sent': ('pivitals_network_transmit_packets', 'Packets transmitted'),
+    'errin': ('pivitals_network_receive_errors', 'Receive errors'),
+    'errout': ('pivitals_network_transmit_errors', 'Transmit errors'),
+    'dropin': ('pivitals_network_receive_drop', 'Received packets dropped'),
+    'dropout': ('pivitals_network_transmit_drop', 'Transmitted packets dropped')
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class _Families:
+    """Metric families in first-seen order, each with its samples kept together"""
+
+    def __init__(self):
+        self._families = {}
+
+    def add(self, name, kind, help_text, value, labels=None, unit=None):
+        """Add one sample; None values are skipped, counters get the _total suffix"""
+        if value is None or not isinstance(value, (int, float)):
+            return
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (kind, help_text, unit, [])
+        suffix = '_total' if kind == 'counter' else ''
+        label_text = ''
+        if labels:
+            label_text = '{' + ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items()) + '}'
+        family[3].append(f'{name}{suffix}{label_text} {_number(value)}')
+
+    def render(self):
+        lines = []
+        for name, (kind, help_text, unit, samples) in self._families.items():
+            lines.append(f'# TYPE {name} {kind}')
+            if unit:
+                lines.append(f'# UNIT {name} {unit}')
+            lines.append(f'# HELP {name} {help_text}')
+            lines.extend(samples)
+        lines.append('# EOF')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _section(metrics, name):
+    value = metrics.get(name)
+    return value if isinstance(value, dict) else {}
+
+
+def _cpu(families, cpu):
+    families.add('pivitals_cpu_usage_percent', 'gauge', 'CPU usage across all cores', cpu.get('usage_percent'),
+                 unit='percent')
+    for core, usage in enumerate(cpu.get('per_core_usage') or []):
+        families.add('pivitals_cpu_core_usage_percent', 'gauge', 'CPU usage per core', usage,
+                     {'core': core}, unit='percent')
+    frequency = (cpu.get('frequency') or {}).get('current')
+    families.add('pivitals_cpu_frequency_hertz', 'gauge', 'Current CPU frequency',
+                 frequency * 1e6 if frequency is not None else None, unit='hertz')
+    families.add('pivitals_cpu_temperature_celsius', 'gauge', 'CPU temperature', cpu.get('temperature'),
+                 unit='celsius')
+
+
+def _memory(families, memory):
+    for field, help_text in (('total', 'Total memory'), ('available', 'Memory available for new processes'),
+                             ('used', 'Memory in use')):
+        families.add(f'pivitals_memory_{field}_bytes', 'gauge', help_text, memory.get(field), unit='bytes')
+    families.add('pivitals_memory_usage_percent', 'gauge', 'Memory in use', memory.get('percent'), unit='percent')
+    swap = memory.get('swap') or {}
+    families.add('pivitals_swap_total_bytes', 'gauge', 'Total swap', swap.get('total'), unit='bytes')
+    families.add('pivitals_swap_used_bytes', 'gauge', 'Swap in use', swap.get('used'), unit='bytes')
+
+
+def _partitions(families, disk):
+    for partition in disk.get('partitions') or []:
+        labels = {
+            'device': partition.get('device'),
+            'mountpoint': partition.get('mountpoint'),
+            'fstype': partition.get('fstype')
+        }
+        families.add('pivitals_filesystem_size_bytes', 'gauge', 'Filesystem size', partition.get('total'),
+                     labels, unit='bytes')
+        families.add('pivitals_filesystem_used_bytes', 'gauge', 'Filesystem space used', partition.get('used'),
+                     labels, unit='bytes')
+        families.add('pivitals_filesystem_free_bytes', 'gauge', 'Filesystem space available',
+                     partition.get('free'), labels, unit='bytes')
+        families.add('pivitals_filesystem_stale', 'gauge', 'Whether the last statvfs missed its deadline',
+                     bool(partition.get('stale')), labels)
+
+
+def _interfaces(families, network):
+    for interface, counters in (network.get('interfaces') or {}).items():
+        for field, (name, help_text) in INTERFACE_COUNTERS.items():
+            families.add(name, 'counter', help_text, counters.get(field), {'interface': interface},
+                         unit='bytes' if name.endswith('_bytes') else None)
+
+
+def _services(families, services):
+    for state, count in (services.get('summary') or {}).items():
+        if state != 'total':
+            families.add('pivitals_services', 'gauge', 'systemd services by active state', count, {'state': state})
+    units = {}
+    for group in ('watched', 'failed', 'running_sample'):
+        for unit in services.get(group) or []:
+            units.setdefault(unit.get('name'), unit)
+    for name, unit in units.items():
+        for state in SERVICE_STATES:
+            families.add('pivitals_service_state', 'gauge',
+                         'systemd active state of watched, failed and sampled running services',
+                         unit.get('active_state') == state, {'name': name, 'state': state})
+
+
+def _security(families, security):
+    families.add('pivitals_sessions', 'gauge', 'Logged-in user sessions', len(security.get('current_sessions') or []))
+    totals = (security.get('failed_login_summary') or {}).get('totals') or {}
+    for kind, count in totals.items():
+        families.add('pivitals_auth_failures', 'counter', 'Failed authentication attempts seen in the auth log',
+                     count, {'kind': kind})
+
+
+def render_openmetrics(snapshot):
+    """OpenMetrics text exposition of one snapshot, as bytes"""
+    metrics = snapshot.metrics
+    families = _Families()
+    families.add('pivitals_snapshot_timestamp_seconds', 'gauge', 'When the sampler collected this snapshot',
+                 snapshot.timestamp, unit='seconds')
+    _cpu(families, _section(metrics, 'cpu'))
+    _memory(families, _section(metrics, 'memory'))
+    _partitions(families, _section(metrics, 'disk'))
+    _interfaces(families, _section(metrics, 'network'))
+    _services(families, _section(metrics, 'services'))
+    _security(families, _section(metrics, 'security'))
+    return families.render()
+
+
+class OpenMetricsExposition:
+    """
+    The exposition of the current snapshot, rendered at most once per tick.
+    The first scrape after a tick renders it; every later scrape of the same
+    snapshot, from any thread, gets the same bytes.
+    """
+
+    def __init__(self):
+        self._seq = None
+        self._body = None
+        self._lock = threading.Lock()
+
+    def body(self, snapshot):
+        with self._lock:
+            if self._seq != snapshot.seq:
+                body = render_openmetrics(snapshot)
+                if self._seq is not None and snapshot.seq < self._seq:
+                    return body
+                self._seq = snapshot.seq
+                self._body = body
+            return self._body
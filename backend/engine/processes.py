@@ -0,0 +1,141 @@
+"""
+Process query index
+Serves sorted, filtered and paginated views of the full process table
+"""
+import heapq
+import json
+import threading
+import time
+from monitors import PROCESS_ROW_FIELDS, get_process_rows, get_proc_process_rows
+from .shared import SharedSnapshot
+
+
+_PID, _NAME, _USER, _STATUS, _CPU, _MEMORY, _RSS, _CREATED = range(len(PROCESS_ROW_FIELDS))
+
+PROCESS_SORT_KEYS = {
+    'cpu': lambda row: row[_CPU] or 0.0,
+    'rss': lambda row: row[_RSS] or 0,
+    # Longest running first; rows without a start time sort last
+    'uptime': lambda row: -(row[_CREATED] or float('inf'))
+}
+
+
+def _row_dict(row, now):
+    return {
+        'pid': row[_PID],
+        'name': row[_NAME],
+        'username': row[_USER],
+        'status': row[_STATUS],
+        'cpu_percent': row[_CPU],
+        'memory_percent': row[_MEMORY],
+        'memory_rss': row[_RSS],
+        'uptime_seconds': int(now - (row[_CREATED] or now))
+    }
+
+
+class ProcessIndex:
+    """
+    Immutable view of one process table refresh.
+    The user and name indexes are only built the first time a filtered query
+    asks for them, and a page is cut with heapq.nlargest(offset + limit), so a
+    query costs O(n log k) and only the requested rows are turned into dicts.
+    """
+
+    def __init__(self, seq, timestamp, rows):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.rows = rows
+        self._by_user = None
+        self._by_name = None
+        self._lock = threading.Lock()
+
+    def _indexes(self):
+        with self._lock:
+            if self._by_user is None:
+                by_user = {}
+                by_name = {}
+                for row in self.rows:
+                    by_user.setdefault(row[_USER], []).append(row)
+                    by_name.setdefault((row[_NAME] or '').lower(), []).append(row)
+                self._by_user = by_user
+                self._by_name = by_name
+            return self._by_user, self._by_name
+
+    def query(self, sort='cpu', user=None, name=None, limit=10, offset=0):
+        """Return (matching count, page of row dicts); raises KeyError for an unknown sort"""
+        key = PROCESS_SORT_KEYS[sort]
+        candidates = self.rows
+        if user or name:
+            by_user, by_name = self._indexes()
+            if user and name:
+                candidates = [row for row in by_user.get(user, ()) if (row[_NAME] or '').lower() == name.lower()]
+            elif user:
+                candidates = by_user.get(user, [])
+            else:
+                candidates = by_name.get(name.lower(), [])
+
+        page = heapq.nlargest(offset + limit, candidates, key=key)[offset:]
+        now = time.time()
+        return len(candidates), [_row_dict(row, now) for row in page]
+
+
+class ProcessTableExchange:
+    """
+    Hands the full process table from the sampling worker to every worker.
+    Registered as a sampler listener, so only the leader captures rows, and only
+    on ticks where the processes collector actually ran. The rows go to a second
+    shared segment; followers decode it on the first query after it changes,
+    never on the sampler tick itself.
+    """
+
+    def __init__(self, rows_source, shared=None):
+        self._rows_source = rows_source
+        self._shared = shared
+        self._shared_warning = None
+        self._last_processes = None
+        self._index = None
+
+    def publish(self, snapshot):
+        processes = snapshot.metrics.get('processes')
+        if processes is None or processes is self._last_processes:
+            return
+        self._last_processes = processes
+
+        rows = self._rows_source()
+        self._index = ProcessIndex(snapshot.seq, snapshot.timestamp, rows)
+        if self._shared is not None and self._shared.try_acquire():
+            try:
+                payload = json.dumps(rows, separators=(',', ':')).encode('utf-8')
+                self._shared.write(snapshot.seq, snapshot.timestamp, payload)
+                self._shared_warning = None
+            except (ValueError, OSError) as e:
+                if self._shared_warning != str(e):
+                    self._shared_warning = str(e)
+                    print(f"Warning: could not share process table: {e}")
+
+    def index(self):
+        """Most recent ProcessIndex from this worker or the shared segment, or None"""
+        current = self._index
+        if self._shared is not None:
+            seq = self._shared.peek_seq()
+            if seq and (current is None or seq > current.seq):
+                result = self._shared.read()
+                if result is not None:
+                    seq, timestamp, payload = result
+                    current = ProcessIndex(seq, timestamp, json.loads(bytes(payload)))
+                    self._index = current
+        return current
+
+
+def create_process_exchange(config):
+    """Build the process table exchange matching the configured process scanner"""
+    rows_source = get_proc_process_rows if config.PROCESS_SCANNER == 'proc' else get_process_rows
+
+    shared = None
+    if config.SHARED_SNAPSHOT_ENABLED:
+        try:
+            shared = SharedSnapshot(config.SHARED_SNAPSHOT_PATH + '.processes', capacity=config.SHARED_SNAPSHOT_BYTES)
+        except OSError as e:
+            print(f"Warning: shared process table unavailable ({e}), queries use the local table")
+
+    return ProcessTableExchange(rows_source, shared=shared)
@@ -0,0 +1,181 @@
+"""
+Snapshot responses
+Serializes each published snapshot once per endpoint and serves it with an ETag
+"""
+import gzip
+import json
+import threading
+from .stream import metrics_payload
+
+
+GZIP_LEVEL = 6
+
+# Distinct fields= selections cached per snapshot; further ones are encoded per request
+MAX_CACHED_BODIES = 64
+MAX_FIELDS = 64
+
+# Top-level keys kept in every pruned payload
+ALWAYS_KEPT = ('seq', 'timestamp', 'error')
+
+
+def _section(name):
+    return lambda snapshot: snapshot.metrics[name]
+
+
+def overview_payload(snapshot):
+    """Snapshot in the shape of /api/v1/system/overview"""
+    return {
+        'processes': snapshot.metrics['processes'],
+        'services': snapshot.metrics['services'],
+        'security': snapshot.metrics['security'],
+        'timestamp': snapshot.timestamp
+    }
+
+
+# Endpoint view name -> payload builder
+SNAPSHOT_VIEWS = {
+    'cpu': _section('cpu'),
+    'memory': _section('memory'),
+    'disk': _section('disk'),
+    'network': _section('network'),
+    'all': metrics_payload,
+    'processes': _section('processes'),
+    'services': _section('services'),
+    'security': _section('security'),
+    'overview': overview_payload
+}
+
+# Where each view sits in the snapshot, as a dotted path ('' for views of the whole snapshot)
+VIEW_PREFIXES = {
+    'cpu': 'cpu',
+    'memory': 'memory',
+    'disk': 'disk',
+    'network': 'network',
+    'all': '',
+    'processes': 'processes',
+    'services': 'services',
+    'security': 'security',
+    'overview': ''
+}
+
+# Top-level sections a view without fields= is limited to, where its prefix is ''
+VIEW_SECTIONS = {
+    'overview': ('processes', 'services', 'security')
+}
+
+
+def parse_fields(value):
+    """
+    A fields= value ('cpu.usage_percent,memory.percent') as a sorted tuple of
+    dotted paths, minus any already covered by a shorter one; None if empty.
+    Raises ValueError past MAX_FIELDS.
+    """
+    requested = sorted({field.strip().strip('.') for field in (value or '').split(',')} - {''})
+    if len(requested) > MAX_FIELDS:
+        raise ValueError(f'At most {MAX_FIELDS} fields can be requested')
+    fields = []
+    for field in requested:
+        if not any(field == kept or field.startswith(kept + '.') for kept in fields):
+            fields.append(field)
+    return tuple(fields) or None
+
+
+def snapshot_fields(view, fields):
+    """A view's fields as paths into the whole snapshot; None if it is the whole snapshot"""
+    prefix = VIEW_PREFIXES.get(view, view)
+    if fields is None:
+        if view in VIEW_SECTIONS:
+            return list(VIEW_SECTIONS[view])
+        return [prefix] if prefix else None
+    return [f'{prefix}.{field}' if prefix else field for field in fields]
+
+
+def prune(payload, fields):
+    """
+    Copy of payload with only the given dotted paths (plus ALWAYS_KEPT keys).
+    Paths descend through dicts only; one that does not exist is left out.
+    """
+    if not isinstance(payload, dict):
+        return payload
+    result = {key: payload[key] for key in ALWAYS_KEPT if key in payload}
+    for field in fields:
+        keys = field.split('.')
+        value = payload
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = result
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+                if not isinstance(target, dict):
+                    break
+            else:
+                target[keys[-1]] = value
+    return result
+
+
+def snapshot_etag(snapshot):
+    """
+    Opaque tag for a snapshot: its sequence number, plus its timestamp so a
+    restarted sampler counting from 1 again never reuses an old tag
+    """
+    return f'{snapshot.seq}-{int(snapshot.timestamp * 1000):x}'
+
+
+class SnapshotResponses:
+    """
+    Response bodies for the current snapshot, built at most once per view and
+    fields= selection. The first request for one after a tick encodes it to
+    JSON bytes (and gzip on first demand); every other client and worker
+    thread gets the same bytes until the next snapshot replaces them.
+    Revalidation against the ETag needs no encoding at all, so polling cost
+    does not grow with clients.
+    """
+
+    def __init__(self, views=None, gzip_min_bytes=1024):
+        self.views = SNAPSHOT_VIEWS if views is None else views
+        self.gzip_min_bytes = gzip_min_bytes
+        self._seq = None
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def _encode(self, snapshot, view, fields):
+        payload = self.views[view](snapshot)
+        if fields is not None:
+            payload = prune(payload, fields)
+        return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+    def body(self, snapshot, view, compressed=False, fields=None):
+        """
+        (bytes, is_gzip) for one view of a snapshot, limited to fields (a
+        parse_fields() tuple) if given. compressed asks for gzip, which is only
+        used when enabled and the body is large enough to gain.
+        """
+        key = (view, fields)
+        with self._lock:
+            if self._seq != snapshot.seq:
+                if self._seq is not None and snapshot.seq < self._seq:
+                    # A request still holding an older snapshot; not worth caching
+                    return self._encode(snapshot, view, fields), False
+                self._seq = snapshot.seq
+                self._bodies = {}
+            entry = self._bodies.get(key)
+            if entry is None:
+                entry = [self._encode(snapshot, view, fields), None]
+                if len(self._bodies) < MAX_CACHED_BODIES:
+                    self._bodies[key] = entry
+            raw, packed = entry
+            if not compressed or self.gzip_min_bytes is None or len(raw) < self.gzip_min_bytes:
+                return raw, False
+            if packed is None:
+                packed = entry[1] = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+            return packed, True
+
+
+def create_responses(config):
+    """Build the snapshot response cache from a configuration object"""
+    return SnapshotResponses(
+        gzip_min_bytes=config.RESPONSE_GZIP_MIN_BYTES if config.RESPONSE_GZIP_ENABLED else None
+    )
@@ -0,0 +1,332 @@
+"""
+Background sampler
+Collects metrics on a fixed tick and publishes read-only snapshots
+"""
+import concurrent.futures
+import json
+import threading
+import time
+from collections import namedtuple
+from functools import partial
+from monitors import (
+    get_cpu_metrics,
+    get_memory_metrics,
+    get_disk_metrics,
+    get_network_metrics,
+    get_process_metrics,
+    get_proc_process_metrics,
+    get_service_metrics,
+    get_security_metrics,
+    native_executor
+)
+from .shared import SharedSnapshot
+
+
+# A published snapshot is never mutated; each tick builds a new one and
+# swaps the reference, so readers can hand it out without locking.
+Snapshot = namedtuple('Snapshot', ['seq', 'timestamp', 'metrics'])
+
+
+def _notify(callbacks, snapshot):
+    for callback in callbacks:
+        try:
+            callback(snapshot)
+        except Exception as e:
+            print(f"Error in sampler callback {callback!r}: {e}")
+
+
+class Sampler:
+    """
+    Runs collectors on a fixed tick in a daemon thread.
+    Each collector is a (name, callable, interval[, timeout]) tuple. The interval
+    is that collector's TTL: it is only re-run once the TTL has elapsed, and the
+    loop wakes early when a TTL shorter than the tick runs out, so a fast
+    collector is never held to the tick and a slow one never refreshes the rest.
+    Readers always get the last published value; a refresh is never run on
+    their behalf, and a collector is never started twice at once.
+
+    Due collectors run concurrently, each on its own OS thread (also under
+    gevent, where waiting for them stays cooperative), so a tick costs the
+    slowest collector rather than the sum and a CPU-bound collector cannot
+    stall request greenlets past its deadline. One that misses its deadline
+    does not hold the tick: its last value is published with 'stale': True (or
+    an error if it never finished), it is not started again while still
+    running, and its result is picked up on a later tick.
+
+    With a SharedSnapshot, only the worker holding the writer lock collects;
+    the others follow the shared segment and decode each new snapshot once.
+    """
+
+    def __init__(self, collectors, interval=1.0, shared=None, timeout=None):
+        self.interval = interval
+        self._tick_lock = threading.Lock()
+        self._collectors = [
+            (name, func, collector_interval or interval, (rest[0] if rest else None) or timeout)
+            for name, func, collector_interval, *rest in collectors
+        ]
+        self._due = {name: 0.0 for name, _, _, _ in self._collectors}
+        self._values = {}
+        self._running = {}
+        # One OS thread per collector: never two runs of one collector at once,
+        # and anything a collector keeps per thread stays on the same thread
+        self._executors = {
+            name: native_executor(1, thread_name_prefix=f'pivitals-{name}')
+            for name, _, _, _ in self._collectors
+        }
+        self._seq = 0
+        self._snapshot = None
+        self._shared = shared
+        self._shared_warning = None
+        self._listeners = []
+        self._scheduled_listeners = []
+        self._subscribers = []
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self._shared is None or self._shared.is_writer
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pivitals-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._shared:
+            self._shared.release()
+
+    def refresh(self, name):
+        """
+        Mark one collector due and tick as soon as possible, for sources that
+        know when their data changed. Safe to call from any thread; wake-ups
+        that arrive during a tick are coalesced into one extra tick.
+        """
+        if name in self._due:
+            self._due[name] = 0.0
+            self._wake.set()
+
+    def add_listener(self, callback, scheduled_only=False):
+        """
+        Call callback(snapshot) after every tick this worker collects itself.
+        With scheduled_only, skip the extra ticks a refresh() or a TTL shorter
+        than the interval triggers, so the callback sees one snapshot per interval.
+        """
+        (self._scheduled_listeners if scheduled_only else self._listeners).append(callback)
+
+    def add_subscriber(self, callback):
+        """
+        Call callback(snapshot) for every snapshot this worker publishes,
+        whether collected locally or picked up from the shared segment
+        """
+        self._subscribers.append(callback)
+
+    def latest(self, timeout=None):
+        """
+        Return the most recent snapshot.
+        Only waits (up to timeout) if nothing has been published yet.
+        """
+        snapshot = self._snapshot
+        if snapshot is None and timeout:
+            self._ready.wait(timeout)
+            snapshot = self._snapshot
+        return snapshot
+
+    def tick(self, scheduled=True):
+        """Run due collectors and publish a new snapshot"""
+        with self._tick_lock:
+            return self._tick(scheduled)
+
+    def _tick(self, scheduled):
+        now = time.monotonic()
+        started = []
+        for name, func, interval, timeout in self._collectors:
+            running = self._running.get(name)
+            if running is not None:
+                if not running.done():
+                    continue
+                self._finish(name, running)
+            if now < self._due[name] and name in self._values:
+                continue
+            # Scheduled before running so a refresh() arriving mid-collection is kept
+            self._due[name] = now + interval
+            self._running[name] = self._executors[name].submit(func)
+            started.append((name, timeout))
+
+        for name, timeout in started:
+            future = self._running[name]
+            try:
+                future.result(timeout=max(now + timeout - time.monotonic(), 0) if timeout else None)
+            except concurrent.futures.TimeoutError:
+                if not future.done():
+                    self._mark_stale(name, timeout)
+                    continue
+            except Exception:
+                pass  # recorded by _finish
+            self._finish(name, future)
+
+        self._seq += 1
+        snapshot = Snapshot(self._seq, time.time(), dict(self._values))
+        if self._shared is not None:
+            self._write_shared(snapshot)
+        self._publish(snapshot)
+        _notify(self._listeners, snapshot)
+        if scheduled:
+            _notify(self._scheduled_listeners, snapshot)
+        return snapshot
+
+    def _next_due(self):
+        """Earliest TTL expiry among collectors not already running"""
+        return min(
+            (self._due[name] for name, _, _, _ in self._collectors if name not in self._running),
+            default=float('inf')
+        )
+
+    def _finish(self, name, future):
+        del self._running[name]
+        try:
+            self._values[name] = future.result(timeout=0)
+        except Exception as e:
+            self._values[name] = {'error': str(e)}
+
+    def _mark_stale(self, name, timeout):
+        previous = self._values.get(name)
+        if isinstance(previous, dict) and 'error' not in previous:
+            self._values[name] = dict(previous, stale=True)
+        elif previous is None:
+            self._values[name] = {'error': f'{name} collector did not finish within {timeout}s'}
+
+    def _publish(self, snapshot):
+        self._snapshot = snapshot
+        self._ready.set()
+        _notify(self._subscribers, snapshot)
+
+    def _write_shared(self, snapshot):
+        payload = json.dumps(snapshot.metrics, separators=(',', ':')).encode('utf-8')
+        try:
+            self._shared.write(snapshot.seq, snapshot.timestamp, payload)
+            self._shared_warning = None
+        except ValueError as e:
+            if self._shared_warning != str(e):
+                self._shared_warning = str(e)
+                print(f"Warning: {e}")
+
+    def _follow(self):
+        """Pick up a newer snapshot from the shared segment, if any"""
+        current = self._snapshot
+        seq = self._shared.peek_seq()
+        if not seq or (current is not None and current.seq == seq):
+            return
+        result = self._shared.read()
+        if result is None:
+            return
+        seq, timestamp, payload = result
+        try:
+            metrics = json.loads(payload)
+        except ValueError:
+            return
+        self._publish(Snapshot(seq, timestamp, metrics))
+
+    def _become_leader(self):
+        # Continue the sequence so clients never see it go backwards
+        self._seq = max(self._seq, self._shared.peek_seq())
+
+    def _run(self):
+        follow_interval = min(self.interval / 4, 0.25)
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            if not self.is_leader:
+                if self._shared.try_acquire():
+                    self._become_leader()
+                    next_tick = time.monotonic()
+                else:
+                    self._follow()
+                    self._stop.wait(follow_interval)
+                    continue
+
+            self._wake.clear()
+            scheduled = time.monotonic() >= next_tick
+            self.tick(scheduled)
+            if scheduled:
+                next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Collection overran the tick; skip missed ticks instead of bursting
+                next_tick = time.monotonic()
+                delay = 0
+            # A refresh() or a short TTL running out wakes the loop early for an
+            # extra tick of just the due collectors
+            self._wake.wait(max(min(delay, self._next_due() - time.monotonic()), 0))
+
+
+def create_sampler(config, demand=None):
+    """
+    Build the metrics sampler from a configuration object.
+    With a CollectorDemand, optional pieces are only collected while wanted.
+    """
+    interval = config.SAMPLER_INTERVAL_SECONDS
+    system_interval = config.SYSTEM_CACHE_SECONDS
+    ttls = config.COLLECTOR_TTLS
+
+    shared = None
+    if config.SHARED_SNAPSHOT_ENABLED:
+        try:
+            shared = SharedSnapshot(config.SHARED_SNAPSHOT_PATH, capacity=config.SHARED_SNAPSHOT_BYTES)
+        except OSError as e:
+            print(f"Warning: shared snapshot unavailable ({e}), sampling per worker")
+
+    def services_changed():
+        sampler.refresh('services')
+
+    process_collector = get_proc_process_metrics if config.PROCESS_SCANNER == 'proc' else get_process_metrics
+
+    collectors = [
+        ('cpu', get_cpu_metrics, interval),
+        ('memory', get_memory_metrics, interval),
+        ('disk', partial(
+            get_disk_metrics,
+            usage_timeout=config.DISK_USAGE_TIMEOUT,
+            usage_workers=config.DISK_USAGE_WORKERS,
+            usage_max_backoff=config.DISK_USAGE_MAX_BACKOFF
+        ), interval),
+        ('network', partial(
+            get_network_metrics,
+            smoothing_seconds=config.NETWORK_RATE_SMOOTHING_SECONDS,
+            wanted=demand.wanted if demand is not None else None
+        ), interval),
+        ('processes', partial(process_collector, limit=config.SYSTEM_PROCESS_LIMIT), config.PROCESS_SAMPLE_SECONDS),
+        ('services', partial(
+            get_service_metrics,
+            limit=config.SYSTEM_SERVICE_LIMIT,
+            watched=config.WATCHED_SERVICES,
+            cgroup_root=config.SERVICE_CGROUP_ROOT,
+            dbus_bus=config.SERVICE_DBUS_BUS if config.SERVICE_DBUS_ENABLED else None,
+            on_change=services_changed,
+            rate_window=interval
+        ), system_interval),
+        ('security', partial(
+            get_security_metrics,
+            login_limit=config.SYSTEM_SECURITY_LIMIT,
+            failed_limit=config.SYSTEM_SECURITY_LIMIT,
+            sudo_limit=config.SYSTEM_SECURITY_LIMIT
+        ), system_interval)
+    ]
+    for name in set(ttls) - {name for name, _, _ in collectors}:
+        print(f"Warning: COLLECTOR_TTLS names unknown collector '{name}'")
+
+    sampler = Sampler(
+        [(name, func, ttls.get(name, default)) for name, func, default in collectors],
+        interval=interval,
+        shared=shared,
+        timeout=config.COLLECTOR_TIMEOUT_SECONDS
+    )
+    return sampler
@@ -0,0 +1,117 @@
+"""
+Shared snapshot segment
+Shares the latest serialized snapshot between gunicorn workers through a
+memory-mapped file guarded by a sequence-number seqlock
+"""
+import fcntl
+import mmap
+import os
+import struct
+import time
+
+
+MAGIC = b'PIVS'
+VERSION = 1
+HEADER_SIZE = 64
+DEFAULT_CAPACITY = 8 * 1024 * 1024
+
+# Header layout: magic, version | seqlock counter | snapshot seq, timestamp, payload length
+_PREAMBLE = struct.Struct('<4sI')
+_LOCK = struct.Struct('<Q')
+_META = struct.Struct('<QdI')
+_LOCK_OFFSET = 8
+_META_OFFSET = 16
+
+
+class SharedSnapshot:
+    """
+    Single-writer, multi-reader snapshot slot.
+    The writer makes the seqlock counter odd while it copies the payload and even
+    again when done; readers retry whenever the counter was odd or changed under them.
+    Writer election uses an exclusive flock on a side file, which the kernel drops
+    automatically if the owning worker dies.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._lock_fd = None
+
+        size = HEADER_SIZE + capacity
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    @property
+    def is_writer(self):
+        return self._lock_fd is not None
+
+    def try_acquire(self):
+        """Try to become the writer; never blocks"""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        if self._map[:4] != MAGIC:
+            _PREAMBLE.pack_into(self._map, 0, MAGIC, VERSION)
+        return True
+
+    def release(self):
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def peek_seq(self):
+        """Snapshot sequence number currently published (0 if none)"""
+        if self._map[:4] != MAGIC:
+            return 0
+        return _META.unpack_from(self._map, _META_OFFSET)[0]
+
+    def write(self, seq, timestamp, payload):
+        if not self.is_writer:
+            raise RuntimeError('SharedSnapshot.write called without holding the writer lock')
+        if len(payload) > self.capacity:
+            raise ValueError(f'Snapshot payload of {len(payload)} bytes exceeds capacity of {self.capacity}')
+
+        counter = _LOCK.unpack_from(self._map, _LOCK_OFFSET)[0]
+        if counter & 1:
+            # A previous writer died mid-update
+            counter += 1
+        _LOCK.pack_into(self._map, _LOCK_OFFSET, counter + 1)
+        self._map[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+        _META.pack_into(self._map, _META_OFFSET, seq, timestamp, len(payload))
+        _LOCK.pack_into(self._map, _LOCK_OFFSET, counter + 2)
+
+    def read(self, retries=100):
+        """
+        Return (seq, timestamp, payload bytes) for a consistent snapshot,
+        or None if nothing has been published or no consistent read was possible.
+        """
+        if self._map[:4] != MAGIC:
+            return None
+        for _ in range(retries):
+            before = _LOCK.unpack_from(self._map, _LOCK_OFFSET)[0]
+            if before & 1:
+                time.sleep(0)
+                continue
+            seq, timestamp, length = _META.unpack_from(self._map, _META_OFFSET)
+            if seq == 0 or length > self.capacity:
+                return None
+            payload = self._map[HEADER_SIZE:HEADER_SIZE + length]
+            if _LOCK.unpack_from(self._map, _LOCK_OFFSET)[0] == before:
+                return seq, timestamp, payload
+        return None
+
+    def close(self):
+        self.release()
+        self._map.close()
@@ -0,0 +1,108 @@
+"""
+Snapshot streaming
+Fans each published snapshot out to Server-Sent Events subscribers
+"""
+import json
+import threading
+import time
+from collections import deque
+from .delta import DeltaEncoder
+
+
+def format_event(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode('utf-8')
+
+
+def metrics_payload(snapshot):
+    """Snapshot in the same shape as /api/v1/metrics/all, plus its sequence number"""
+    return {
+        'seq': snapshot.seq,
+        'cpu': snapshot.metrics.get('cpu'),
+        'memory': snapshot.metrics.get('memory'),
+        'disk': snapshot.metrics.get('disk'),
+        'network': snapshot.metrics.get('network'),
+        'timestamp': snapshot.timestamp
+    }
+
+
+class SnapshotBroadcaster:
+    """
+    Serializes every snapshot once and hands the same bytes to every subscriber.
+    A short backlog of recent events lets reconnecting clients resume from
+    their Last-Event-ID instead of missing ticks. Delta subscribers instead get
+    patches against the last snapshot they saw, with periodic keyframes.
+    """
+
+    def __init__(self, backlog=120, heartbeat_seconds=15, keyframe_interval=30):
+        self.heartbeat_seconds = heartbeat_seconds
+        self.delta = DeltaEncoder(metrics_payload, keyframe_interval=keyframe_interval)
+        self._events = deque(maxlen=backlog)
+        self._condition = threading.Condition()
+
+    def publish(self, snapshot):
+        """Sampler subscriber"""
+        self.delta.record(snapshot)
+        data = json.dumps(metrics_payload(snapshot), separators=(',', ':'))
+        event = (snapshot.seq, snapshot.timestamp, format_event(snapshot.seq, 'metrics', data))
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify_all()
+
+    def _pending(self, last_seq):
+        """Events newer than last_seq; only the latest one for new clients"""
+        if not self._events:
+            return []
+        if last_seq is None or last_seq < self._events[0][0] - 1 or last_seq > self._events[-1][0]:
+            # New client, a gap older than the backlog, or an id from a previous run
+            return [self._events[-1]]
+        return [event for event in self._events if event[0] > last_seq]
+
+    def _has_news(self, last_seq, delta):
+        if delta:
+            latest = self.delta.latest_seq
+            return latest is not None and latest != last_seq
+        return bool(self._pending(last_seq))
+
+    def subscribe(self, last_event_id=None, min_interval=0.0, retry_ms=3000, delta=False):
+        """
+        Generator of SSE byte chunks for one client.
+        min_interval throttles delivery for clients that want fewer updates;
+        each delivered event is always the newest available one.
+        With delta=True, events are 'patch' diffs against the previous event
+        and full 'metrics' keyframes whenever a resync is due.
+        """
+        try:
+            last_seq = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_seq = None
+
+        yield f"retry: {retry_ms}\n\n".encode('utf-8')
+        last_sent = 0.0
+        while True:
+            with self._condition:
+                if not self._has_news(last_seq, delta):
+                    self._condition.wait(self.heartbeat_seconds)
+                has_news = self._has_news(last_seq, delta)
+
+            if not has_news:
+                yield b': heartbeat\n\n'
+                continue
+
+            if min_interval:
+                wait = last_sent + min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                    continue
+
+            if delta:
+                seq, kind, data = self.delta.encode(last_seq)
+                yield format_event(seq, 'metrics' if kind == 'keyframe' else 'patch', data)
+                last_seq = seq
+            else:
+                pending = self._pending(last_seq)
+                if min_interval:
+                    pending = pending[-1:]
+                for seq, _, payload in pending:
+                    yield payload
+                last_seq = pending[-1][0]
+            last_sent = time.monotonic()
@@ -5,9 +5,12 @@ from .cpu_monitor import get_cpu_metrics
 from .memory_monitor import get_memory_metrics
 from .disk_monitor import get_disk_metrics
 from .network_monitor import get_network_metrics
-from .process_monitor import get_process_metrics
+from .process_monitor import get_process_metrics, get_process_rows, PROCESS_ROW_FIELDS
+from .proc_scanner import get_proc_process_metrics, get_proc_process_rows
 from .service_monitor import get_service_metrics
+from .cgroup_monitor import get_service_usage
 from .security_monitor import get_security_metrics
+from .concurrency import native_executor, on_main_hub
 
 __all__ = [
     'get_cpu_metrics',
@@ -15,6 +18,13 @@ __all__ = [
     'get_disk_metrics',
     'get_network_metrics',
     'get_process_metrics',
+    'get_process_rows',
+    'PROCESS_ROW_FIELDS',
+    'get_proc_process_metrics',
+    'get_proc_process_rows',
     'get_service_metrics',
-    'get_security_metrics'
+    'get_service_usage',
+    'get_security_metrics',
+    'native_executor',
+    'on_main_hub'
 ]
@@ -0,0 +1,144 @@
+"""
+Service resource accounting
+Per-unit CPU, memory and IO usage read from the cgroup v2 hierarchy
+"""
+import heapq
+import os
+import threading
+import time
+
+
+DEFAULT_CGROUP_ROOT = '/sys/fs/cgroup'
+SERVICE_SLICE = 'system.slice'
+
+
+def _read_int(path):
+    try:
+        with open(path, 'rb') as handle:
+            return int(handle.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_cpu_usage_usec(path):
+    try:
+        with open(path, 'rb') as handle:
+            for line in handle:
+                if line.startswith(b'usage_usec '):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _read_io_bytes(path):
+    """Total (rbytes, wbytes) across all devices in io.stat, or None"""
+    read_bytes = write_bytes = 0
+    try:
+        with open(path, 'rb') as handle:
+            for line in handle:
+                for field in line.split()[1:]:
+                    if field.startswith(b'rbytes='):
+                        read_bytes += int(field[7:])
+                    elif field.startswith(b'wbytes='):
+                        write_bytes += int(field[7:])
+    except (OSError, ValueError):
+        return None
+    return read_bytes, write_bytes
+
+
+def _rate(current, previous, elapsed):
+    if current is None or previous is None or not elapsed or current < previous:
+        return None
+    return (current - previous) / elapsed
+
+
+class CgroupAccounting:
+    """
+    Samples every <slice>/*.service cgroup with three small file reads per unit.
+    Counters from the previous sample are kept per unit to turn cumulative CPU
+    time and IO bytes into rates; units that restart get a new cgroup whose
+    counters start over, which shows up as one sample without rates.
+    A sample taken less than min_window seconds after the last baseline (an
+    extra sampler tick) keeps that baseline and repeats its rates, so rates are
+    never measured over a shorter window.
+    """
+
+    def __init__(self, root=DEFAULT_CGROUP_ROOT, slice_name=SERVICE_SLICE, min_window=0.0):
+        self.root = root
+        self.slice_path = os.path.join(root, slice_name)
+        self.min_window = min_window
+        self._previous = {}
+        self._previous_at = None
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Return {unit name: usage dict}; empty if the slice does not exist"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._previous_at if self._previous_at else None
+            rebase = elapsed is None or elapsed >= self.min_window
+            previous = self._previous
+            current = {}
+            rates = {}
+            usage = {}
+
+            try:
+                entries = os.scandir(self.slice_path)
+            except OSError:
+                return {}
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.endswith('.service') or not entry.is_dir(follow_symlinks=False):
+                        continue
+                    path = entry.path
+                    cpu_usec = _read_cpu_usage_usec(os.path.join(path, 'cpu.stat'))
+                    memory = _read_int(os.path.join(path, 'memory.current'))
+                    io_bytes = _read_io_bytes(os.path.join(path, 'io.stat'))
+                    read_bytes, write_bytes = io_bytes if io_bytes else (None, None)
+                    current[name] = (cpu_usec, read_bytes, write_bytes)
+
+                    if rebase:
+                        before = previous.get(name, (None, None, None))
+                        rates[name] = (
+                            _rate(cpu_usec, before[0], elapsed),
+                            _rate(read_bytes, before[1], elapsed),
+                            _rate(write_bytes, before[2], elapsed)
+                        )
+                    cpu_rate, read_rate, write_rate = (rates if rebase else self._rates).get(name, (None, None, None))
+                    usage[name] = {
+                        'cpu_percent': round(cpu_rate / 10000, 1) if cpu_rate is not None else None,
+                        'memory_bytes': memory,
+                        'io_read_bytes_per_sec': round(read_rate, 1) if read_rate is not None else None,
+                        'io_write_bytes_per_sec': round(write_rate, 1) if write_rate is not None else None
+                    }
+
+            if rebase:
+                self._previous = current
+                self._previous_at = now
+                self._rates = rates
+            return usage
+
+
+_accounting = None
+
+
+def get_service_usage(root=DEFAULT_CGROUP_ROOT, min_window=0.0):
+    """Per-service usage keyed by unit name, from the cgroup v2 tree under root"""
+    global _accounting
+    if _accounting is None or _accounting.root != root:
+        _accounting = CgroupAccounting(root, min_window=min_window)
+    _accounting.min_window = min_window
+    return _accounting.sample()
+
+
+def top_service_usage(usage, limit, field):
+    """The limit units with the highest value of field, as rows carrying the unit name"""
+    rows = heapq.nlargest(
+        limit,
+        (item for item in usage.items() if item[1][field] is not None),
+        key=lambda item: item[1][field]
+    )
+    return [{'name': name, **values} for name, values in rows]
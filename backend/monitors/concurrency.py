@@ -0,0 +1,138 @@
+"""
+Native thread and syscall helpers
+Collectors that may block in the kernel need real OS threads and unpatched
+select primitives, even when gunicorn's gevent worker has monkey-patched them
+"""
+import concurrent.futures
+import importlib
+
+
+def _gevent_patched(module):
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched(module)
+
+
+def original(module, name):
+    """The stdlib object before any gevent monkey-patching (e.g. select.poll)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return getattr(importlib.import_module(module), name)
+    return monkey.get_original(module, name)
+
+
+class _NativeThreadExecutor:
+    """
+    submit() onto a fixed set of OS threads started with the unpatched
+    _thread module and fed from an unpatched queue. Each result is handed back
+    on the submitting thread's hub, where waits on the Future are cooperative;
+    setting it from a thread without a hub would not wake the waiter.
+    """
+
+    def __init__(self, max_workers):
+        self._workers = max_workers
+        self._jobs = original('queue', 'SimpleQueue')()
+        start = original('_thread', 'start_new_thread')
+        for _ in range(max_workers):
+            start(self._work, ())
+
+    @staticmethod
+    def _settle(future, result, error):
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            hub, future, func, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            result = error = None
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                error = e
+            hub.loop.run_callback_threadsafe(self._settle, future, result, error)
+
+    def submit(self, func, *args, **kwargs):
+        from gevent import get_hub
+        future = concurrent.futures.Future()
+        self._jobs.put((get_hub(), future, func, args, kwargs))
+        return future
+
+    def shutdown(self, wait=True):
+        """Let the workers exit once the jobs already queued are done; never waits"""
+        for _ in range(self._workers):
+            self._jobs.put(None)
+
+
+def native_executor(max_workers, thread_name_prefix='pivitals'):
+    """
+    A concurrent.futures-style executor whose workers are OS threads.
+    Under gevent a patched ThreadPoolExecutor would run jobs as greenlets, and a
+    job stuck in a syscall or busy on the CPU would then stall the whole
+    worker. gevent's own threadpool is not used either: its worker threads can
+    miss the wake-up when a lock they wait for is released by another one.
+    """
+    if _gevent_patched('threading'):
+        return _NativeThreadExecutor(max_workers)
+    return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+
+def native_lock():
+    """
+    An unpatched lock, for state shared between collector threads and
+    greenlets on the main hub: a gevent lock released on one of those threads
+    does not reliably wake a greenlet waiting on another. Waiting blocks the
+    whole OS thread, so keep the critical sections short.
+    """
+    return original('_thread', 'allocate_lock')()
+
+
+def _gevent_hub():
+    if not _gevent_patched('threading'):
+        return None
+    from gevent import get_hub
+    return get_hub()
+
+
+# The hub of the thread that imported this module (the worker's main thread)
+_main_hub = _gevent_hub()
+
+
+def on_main_hub(func, *args, **kwargs):
+    """
+    Call func on the main thread's gevent hub and wait for its result.
+    Collectors run on native threads, but gevent only runs subprocesses on the
+    main loop, and a patched Thread started from a native thread would be a
+    greenlet stranded on that thread's hub. Without gevent, or when already on
+    the main hub, func is simply called.
+    """
+    if _main_hub is None or _gevent_hub() is _main_hub:
+        return func(*args, **kwargs)
+
+    import gevent
+    done = original('_thread', 'allocate_lock')()
+    done.acquire()
+    outcome = {}
+
+    def call():
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            done.release()
+
+    _main_hub.loop.run_callback_threadsafe(gevent.spawn, call)
+    done.acquire()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
@@ -0,0 +1,19 @@
+"""
+Kernel counter helpers
+Shared by collectors that turn cumulative counters into rates
+"""
+
+# 32-bit kernels (armv7 Pis) expose unsigned long counters in /proc
+COUNTER_WRAP = 2 ** 32
+
+
+def counter_delta(value, before):
+    """Increase of a counter, allowing one 32-bit wrap; None if it was reset"""
+    delta = value - before
+    if delta >= 0:
+        return delta
+    if before < COUNTER_WRAP:
+        wrapped = delta + COUNTER_WRAP
+        if 0 <= wrapped < COUNTER_WRAP // 2:
+            return wrapped
+    return None
@@ -2,6 +2,7 @@
 CPU monitoring module
 Collects CPU usage, temperature, and frequency data
 """
+import threading
 import psutil
 import os
 
@@ -35,17 +36,113 @@ def get_cpu_temperature():
     return None
 
 
+PROC_STAT_PATH = '/proc/stat'
+
+# /proc/stat column order; guest time is already folded into user/nice
+CPU_TIME_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+
+
+def _read_proc_stat(path=PROC_STAT_PATH):
+    """
+    Read aggregate and per-core CPU times from a single /proc/stat read.
+    Returns (total, [per_core]) where each entry is a tuple in CPU_TIME_FIELDS order.
+    """
+    total = None
+    per_core = []
+    with open(path, 'r') as stat_file:
+        for line in stat_file:
+            if not line.startswith('cpu'):
+                break
+            parts = line.split()
+            values = tuple(int(value) for value in parts[1:len(CPU_TIME_FIELDS) + 1])
+            values += (0,) * (len(CPU_TIME_FIELDS) - len(values))
+            if parts[0] == 'cpu':
+                total = values
+            else:
+                per_core.append(values)
+    return total, per_core
+
+
+def _read_psutil_times():
+    """Fallback for systems without /proc/stat"""
+    def to_tuple(times):
+        return tuple(getattr(times, field, 0.0) for field in CPU_TIME_FIELDS)
+    return to_tuple(psutil.cpu_times()), [to_tuple(t) for t in psutil.cpu_times(percpu=True)]
+
+
+def _usage_percent(previous, current):
+    """Busy percentage between two CPU time samples (idle and iowait count as idle)"""
+    deltas = [max(cur - prev, 0) for prev, cur in zip(previous, current)]
+    elapsed = sum(deltas)
+    if elapsed <= 0:
+        return 0.0, deltas, elapsed
+    idle = deltas[3] + deltas[4]
+    return (elapsed - idle) / elapsed * 100.0, deltas, elapsed
+
+
+class CpuCollector:
+    """
+    Stateful CPU collector.
+    Keeps the previous CPU time sample and computes utilisation from the delta
+    between calls, so no call ever sleeps. The first call reports averages since boot.
+    """
+
+    def __init__(self, stat_path=PROC_STAT_PATH):
+        self.stat_path = stat_path
+        self._previous = None
+        self._previous_cores = []
+        self._counts = None
+        self._lock = threading.Lock()
+
+    def _read_times(self):
+        if os.path.exists(self.stat_path):
+            total, per_core = _read_proc_stat(self.stat_path)
+            if total is not None:
+                return total, per_core
+        return _read_psutil_times()
+
+    def collect(self):
+        with self._lock:
+            total, per_core = self._read_times()
+            previous = self._previous or (0,) * len(CPU_TIME_FIELDS)
+            usage, deltas, elapsed = _usage_percent(previous, total)
+
+            per_core_usage = []
+            for index, core in enumerate(per_core):
+                if index < len(self._previous_cores):
+                    core_previous = self._previous_cores[index]
+                else:
+                    core_previous = (0,) * len(CPU_TIME_FIELDS)
+                per_core_usage.append(_usage_percent(core_previous, core)[0])
+
+            self._previous = total
+            self._previous_cores = per_core
+
+            if elapsed > 0:
+                breakdown = {
+                    field: round(delta / elapsed * 100.0, 1)
+                    for field, delta in zip(CPU_TIME_FIELDS, deltas)
+                }
+            else:
+                breakdown = {field: 0.0 for field in CPU_TIME_FIELDS}
+
+            if self._counts is None:
+                self._counts = (psutil.cpu_count(logical=False), psutil.cpu_count(logical=True))
+
+        return usage, per_core_usage, breakdown, self._counts
+
+
+_collector = CpuCollector()
+
+
 def get_cpu_metrics():
     """
     Get comprehensive CPU metrics
     Returns a dictionary with usage, temperature, frequency, and core information
     """
     try:
-        # Get CPU usage percentage (interval=1 for more accurate reading)
-        cpu_percent = psutil.cpu_percent(interval=1)
-
-        # Get per-core usage
-        per_core_usage = psutil.cpu_percent(interval=0.1, percpu=True)
+        # Utilisation since the previous call, from CPU time deltas
+        cpu_percent, per_core_usage, breakdown, counts = _collector.collect()
 
         # Get CPU frequency
         cpu_freq = psutil.cpu_freq()
@@ -56,8 +153,7 @@ def get_cpu_metrics():
         }
 
         # Get core count
-        core_count = psutil.cpu_count(logical=False)
-        logical_count = psutil.cpu_count(logical=True)
+        core_count, logical_count = counts
 
         # Get temperature
         temperature = get_cpu_temperature()
@@ -68,7 +164,8 @@ def get_cpu_metrics():
             'frequency': frequency,
             'core_count': core_count,
             'logical_count': logical_count,
-            'per_core_usage': [round(usage, 1) for usage in per_core_usage]
+            'per_core_usage': [round(usage, 1) for usage in per_core_usage],
+            'breakdown': breakdown
         }
 
     except Exception as e:
@@ -79,5 +176,6 @@ def get_cpu_metrics():
             'frequency': None,
             'core_count': None,
             'logical_count': None,
-            'per_core_usage': []
+            'per_core_usage': [],
+            'breakdown': None
         }
@@ -2,32 +2,339 @@
 Disk monitoring module
 Collects disk usage and I/O statistics
 """
+import concurrent.futures
+import os
+import select
+import threading
+import time
 import psutil
+from .concurrency import native_executor, original
+from .counters import counter_delta
 
 
-def get_disk_metrics():
+# Device name prefixes that are not backed by real storage
+PSEUDO_DEVICE_PREFIXES = ('loop', 'ram', 'zram')
+
+SECTOR_BYTES = 512
+
+# Network filesystems are watched too; their statvfs is what hangs when a server goes away
+NETWORK_FSTYPES = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'ceph', 'glusterfs'}
+
+# Re-list mounts at least this often where mountinfo cannot be polled
+MOUNT_LIST_FALLBACK_SECONDS = 60
+
+# Cumulative /proc/diskstats columns after the device name that we diff:
+# reads, sectors read, ms reading, writes, sectors written, ms writing,
+# ms doing IO, weighted ms doing IO (in-flight IOs, column 8, is a gauge)
+_COUNTER_COLUMNS = (0, 2, 3, 4, 6, 7, 9, 10)
+_IN_FLIGHT = 8
+
+
+def _await(ms_delta, ios_delta):
+    return round(ms_delta / ios_delta, 2) if ios_delta else 0.0
+
+
+class DiskStats:
     """
-    Get comprehensive disk metrics
-    Returns a dictionary with partition usage and I/O statistics
+    Per-device IO rates from consecutive /proc/diskstats samples, computed the
+    way iostat -x does. Only whole block devices listed in /sys/block are kept,
+    so partitions never double-count their disk, and loop/ram/zram devices are
+    skipped. A device's first sample, or a counter reset, yields None rates.
     """
-    try:
-        # Get disk partitions
-        partitions = []
-        for partition in psutil.disk_partitions():
+
+    def __init__(self, proc_root='/proc', sys_root='/sys'):
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self._previous = {}
+        self._previous_at = None
+        self._lock = threading.Lock()
+
+    def _block_devices(self):
+        try:
+            names = os.listdir(os.path.join(self.sys_root, 'block'))
+        except OSError:
+            return None
+        return {name for name in names if not name.startswith(PSEUDO_DEVICE_PREFIXES)}
+
+    def sample(self):
+        """Return {device: stats dict}, or None if /proc/diskstats is unreadable"""
+        with self._lock:
             try:
-                usage = psutil.disk_usage(partition.mountpoint)
+                with open(os.path.join(self.proc_root, 'diskstats'), 'rb') as handle:
+                    lines = handle.read().splitlines()
+            except OSError:
+                return None
+            now = time.monotonic()
+            elapsed = now - self._previous_at if self._previous_at else None
+            devices = self._block_devices()
+            previous = self._previous
+            current = {}
+            result = {}
+
+            for line in lines:
+                fields = line.split()
+                if len(fields) < 14:
+                    continue
+                name = fields[2].decode()
+                if name.startswith(PSEUDO_DEVICE_PREFIXES) or (devices is not None and name not in devices):
+                    continue
+                values = [int(value) for value in fields[3:14]]
+                counters = [values[column] for column in _COUNTER_COLUMNS]
+                current[name] = counters
+
+                before = previous.get(name)
+                deltas = None
+                if elapsed and before is not None:
+                    deltas = [counter_delta(value, old) for value, old in zip(counters, before)]
+                    if None in deltas:
+                        deltas = None
+
+                if deltas is None:
+                    result[name] = {
+                        'read_iops': None,
+                        'write_iops': None,
+                        'read_bytes_per_sec': None,
+                        'write_bytes_per_sec': None,
+                        'read_await_ms': None,
+                        'write_await_ms': None,
+                        'await_ms': None,
+                        'queue_depth': None,
+                        'util_percent': None,
+                        'in_flight': values[_IN_FLIGHT]
+                    }
+                    continue
+
+                reads, sectors_read, ms_reading, writes, sectors_written, ms_writing, io_ms, weighted_ms = deltas
+                result[name] = {
+                    'read_iops': round(reads / elapsed, 1),
+                    'write_iops': round(writes / elapsed, 1),
+                    'read_bytes_per_sec': round(sectors_read * SECTOR_BYTES / elapsed, 1),
+                    'write_bytes_per_sec': round(sectors_written * SECTOR_BYTES / elapsed, 1),
+                    'read_await_ms': _await(ms_reading, reads),
+                    'write_await_ms': _await(ms_writing, writes),
+                    'await_ms': _await(ms_reading + ms_writing, reads + writes),
+                    'queue_depth': round(weighted_ms / (elapsed * 1000), 2),
+                    'util_percent': round(min(io_ms / (elapsed * 1000) * 100, 100.0), 1),
+                    'in_flight': values[_IN_FLIGHT]
+                }
+
+            self._previous = current
+            self._previous_at = now
+            return result
+
+
+_disk_stats = DiskStats()
+
+
+class MountTable:
+    """
+    Mounted filesystems to report, re-listed only when the kernel signals a
+    mount table change: /proc/self/mountinfo polls POLLPRI | POLLERR after any
+    mount or unmount, so an unchanged table costs one non-blocking poll.
+    """
+
+    def __init__(self, mountinfo_path='/proc/self/mountinfo'):
+        self._mounts = None
+        self._listed_at = 0.0
+        self._poller = None
+        self._mountinfo = None
+        try:
+            self._mountinfo = open(mountinfo_path, 'rb')
+            self._poller = original('select', 'poll')()
+            self._poller.register(self._mountinfo, select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            self._poller = None
+
+    def _changed(self):
+        if self._poller is None:
+            return time.monotonic() - self._listed_at >= MOUNT_LIST_FALLBACK_SECONDS
+        return bool(self._poller.poll(0))
+
+    def mounts(self):
+        if self._mounts is None or self._changed():
+            physical = psutil.disk_partitions()
+            seen = {partition.mountpoint for partition in physical}
+            network = [
+                partition for partition in psutil.disk_partitions(all=True)
+                if partition.fstype in NETWORK_FSTYPES and partition.mountpoint not in seen
+            ]
+            self._mounts = physical + network
+            self._listed_at = time.monotonic()
+        return self._mounts
+
+
+class MountState:
+    """Last good usage and backoff bookkeeping for one mountpoint"""
+
+    __slots__ = ('usage', 'stale', 'failures', 'retry_at', 'pending', 'started_at', 'overdue', 'error')
+
+    def __init__(self):
+        self.usage = None
+        self.stale = False
+        self.failures = 0
+        self.retry_at = 0.0
+        self.pending = None
+        self.started_at = None
+        self.overdue = False
+        self.error = None
+
+
+class MountUsage:
+    """
+    Filesystem usage with every statvfs on a pool of native threads.
+    Each collection waits at most `timeout` seconds for all mounts together.
+    A call that has been running for `timeout` seconds (time spent queued does
+    not count) marks its mount stale, which keeps serving its last good value;
+    it is not retried while its old call is still stuck, and after that only
+    once its backoff (doubling up to max_backoff) has expired. A late answer
+    from a stuck call is still used once it arrives. While unfinished calls,
+    stuck ones included, occupy every pool thread, further calls get a thread
+    of their own, so hung mounts never queue the healthy ones.
+    """
+
+    def __init__(self, timeout=1.0, workers=4, max_backoff=300.0):
+        self.timeout = timeout
+        self.workers = workers
+        self.max_backoff = max_backoff
+        self._executor = native_executor(workers, thread_name_prefix='pivitals-statvfs')
+        # Pool calls not finished yet, including those of mounts since unmounted
+        self._pooled = set()
+        self._mount_table = MountTable()
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _succeeded(self, state, usage):
+        state.usage = usage
+        state.stale = False
+        state.failures = 0
+        state.retry_at = 0.0
+        state.error = None
+
+    def _failed(self, state, now, error):
+        state.stale = True
+        state.failures += 1
+        state.retry_at = now + min(self.timeout * 2 ** state.failures, self.max_backoff)
+        state.error = error
+
+    def _overdue(self, state, now):
+        """Back off a call that has been running for at least timeout seconds, once"""
+        if state.overdue or state.started_at is None or now - state.started_at < self.timeout:
+            return
+        state.overdue = True
+        self._failed(state, now, f'statvfs timed out after {self.timeout}s')
+
+    def _statvfs(self, state, mountpoint):
+        state.started_at = time.monotonic()
+        return psutil.disk_usage(mountpoint)
+
+    def _submit(self, state, mountpoint):
+        state.started_at = None
+        state.overdue = False
+        self._pooled = {future for future in self._pooled if not future.done()}
+        if len(self._pooled) < self.workers:
+            future = self._executor.submit(self._statvfs, state, mountpoint)
+            self._pooled.add(future)
+            return future
+        executor = native_executor(1, thread_name_prefix='pivitals-statvfs')
+        try:
+            return executor.submit(self._statvfs, state, mountpoint)
+        finally:
+            executor.shutdown(wait=False)
+
+    def _settle(self, state, future, now):
+        """Apply a finished statvfs call; returns False if the mount is not ours to read"""
+        state.pending = None
+        try:
+            self._succeeded(state, future.result(timeout=0))
+        except PermissionError:
+            return False
+        except Exception as e:
+            self._failed(state, now, str(e))
+        return True
+
+    def collect(self):
+        with self._lock:
+            now = time.monotonic()
+            mounts = self._mount_table.mounts()
+            waiting = []
+            skipped = set()
+
+            # Calls that started late in an earlier collection may be overdue by now
+            for state in self._states.values():
+                if state.pending is not None and not state.pending.done():
+                    self._overdue(state, now)
+
+            for partition in mounts:
+                state = self._states.get(partition.mountpoint)
+                if state is None:
+                    state = self._states[partition.mountpoint] = MountState()
+                if state.pending is not None:
+                    if not state.pending.done():
+                        continue
+                    if not self._settle(state, state.pending, now):
+                        skipped.add(partition.mountpoint)
+                        continue
+                if now < state.retry_at:
+                    continue
+                state.pending = self._submit(state, partition.mountpoint)
+                waiting.append((partition.mountpoint, state))
+
+            deadline = now + self.timeout
+            for mountpoint, state in waiting:
+                future = state.pending
+                try:
+                    future.result(timeout=max(deadline - time.monotonic(), 0))
+                except concurrent.futures.TimeoutError:
+                    if not future.done():
+                        # Stuck in the kernel or not started yet: leave it pending
+                        self._overdue(state, time.monotonic())
+                        continue
+                except Exception:
+                    pass  # recorded by _settle
+                if not self._settle(state, future, now):
+                    skipped.add(mountpoint)
+
+            partitions = []
+            for partition in mounts:
+                state = self._states[partition.mountpoint]
+                if partition.mountpoint in skipped or (state.usage is None and state.error is None):
+                    continue
+                usage = state.usage
                 partitions.append({
                     'device': partition.device,
                     'mountpoint': partition.mountpoint,
                     'fstype': partition.fstype,
-                    'total': usage.total,
-                    'used': usage.used,
-                    'free': usage.free,
-                    'percent': round(usage.percent, 1)
+                    'total': usage.total if usage else None,
+                    'used': usage.used if usage else None,
+                    'free': usage.free if usage else None,
+                    'percent': round(usage.percent, 1) if usage else None,
+                    'stale': state.stale,
+                    **({'error': state.error} if state.error else {})
                 })
-            except PermissionError:
-                # Skip partitions we can't access
-                continue
+
+            # Forget mounts that were unmounted
+            current = {partition.mountpoint for partition in mounts}
+            for mountpoint in [mp for mp in self._states if mp not in current]:
+                del self._states[mountpoint]
+            return partitions
+
+
+_mount_usage = None
+
+
+def get_disk_metrics(usage_timeout=1.0, usage_workers=4, usage_max_backoff=300.0):
+    """
+    Get comprehensive disk metrics
+    Returns a dictionary with partition usage, I/O statistics and per-device
+    IOPS, throughput, await, queue depth and utilisation.
+    Usage of a mount that stops answering within usage_timeout is served from
+    its last good value with 'stale': True.
+    """
+    global _mount_usage
+    try:
+        if _mount_usage is None:
+            _mount_usage = MountUsage(usage_timeout, usage_workers, usage_max_backoff)
+        partitions = _mount_usage.collect()
 
         # Get I/O counters
         io_counters = psutil.disk_io_counters()
@@ -44,12 +351,14 @@ def get_disk_metrics():
 
         return {
             'partitions': partitions,
-            'io_counters': io_data
+            'io_counters': io_data,
+            'devices': _disk_stats.sample() or {}
         }
 
     except Exception as e:
         return {
             'error': str(e),
             'partitions': [],
-            'io_counters': None
+            'io_counters': None,
+            'devices': {}
         }
@@ -2,18 +2,132 @@
 Network monitoring module
 Collects network interface and connection statistics
 """
+import math
+import threading
+import time
 import psutil
+from .counters import counter_delta
+from .proc_net import count_connections
 
 
-def get_network_metrics():
+RATE_FIELDS = (
+    'bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+    'errin', 'errout', 'dropin', 'dropout'
+)
+RATE_KEYS = tuple(f'{field}_per_sec' for field in RATE_FIELDS)
+
+
+class InterfaceRates:
+    """
+    Per-interface counter rates kept across sampler ticks.
+    Rates are smoothed with a time-aware EWMA (alpha = 1 - exp(-dt / tau)) so
+    an irregular tick does not over-weight one sample. An interface's first
+    sighting, or any counter going backwards in a way a 32-bit wrap cannot
+    explain (driver reload, interface recreated), only sets a new baseline;
+    rates for it are None until the next tick. Interfaces that disappear are
+    forgotten.
+    """
+
+    def __init__(self, smoothing_seconds=2.0):
+        self.smoothing_seconds = smoothing_seconds
+        self._previous = {}
+        self._smoothed = {}
+        self._lock = threading.Lock()
+
+    def update(self, counters, now=None):
+        """counters maps interface -> values in RATE_FIELDS order; returns interface -> rate dict"""
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            result = {}
+            for name, values in counters.items():
+                previous = self._previous.get(name)
+                self._previous[name] = (now, values)
+                deltas = None
+                if previous is not None and now > previous[0]:
+                    deltas = [counter_delta(value, before) for value, before in zip(values, previous[1])]
+                    if None in deltas:
+                        deltas = None
+                if deltas is None:
+                    self._smoothed.pop(name, None)
+                    result[name] = dict.fromkeys(RATE_KEYS)
+                    continue
+
+                elapsed = now - previous[0]
+                alpha = 1.0 - math.exp(-elapsed / self.smoothing_seconds) if self.smoothing_seconds > 0 else 1.0
+                smoothed = self._smoothed.get(name)
+                rates = [delta / elapsed for delta in deltas]
+                if smoothed is not None:
+                    rates = [old + alpha * (rate - old) for rate, old in zip(rates, smoothed)]
+                self._smoothed[name] = rates
+                result[name] = {key: round(rate, 1) for key, rate in zip(RATE_KEYS, rates)}
+
+            for name in [name for name in self._previous if name not in counters]:
+                del self._previous[name]
+                self._smoothed.pop(name, None)
+            return result
+
+
+_interface_rates = InterfaceRates()
+
+
+def _psutil_connection_stats():
+    """Connection counts via psutil.net_connections (non-Linux fallback)"""
+    try:
+        connections = psutil.net_connections()
+        connection_stats = {
+            'established': 0,
+            'listen': 0,
+            'time_wait': 0,
+            'close_wait': 0,
+            'total': len(connections)
+        }
+
+        for conn in connections:
+            status = conn.status.lower()
+            if status == 'established':
+                connection_stats['established'] += 1
+            elif status == 'listen':
+                connection_stats['listen'] += 1
+            elif status == 'time_wait':
+                connection_stats['time_wait'] += 1
+            elif status == 'close_wait':
+                connection_stats['close_wait'] += 1
+
+    except (psutil.AccessDenied, PermissionError):
+        # Some systems require root to access connection info
+        connection_stats = {
+            'error': 'Permission denied - run with elevated privileges to see connections',
+            'established': None,
+            'listen': None,
+            'time_wait': None,
+            'close_wait': None,
+            'total': None
+        }
+
+    return connection_stats
+
+
+def get_network_metrics(smoothing_seconds=2.0, wanted=None):
     """
     Get comprehensive network metrics
-    Returns a dictionary with interface stats and connection information
+    Returns a dictionary with interface stats and connection information.
+    Each interface carries smoothed per-second 'rates', and 'totals' sums the
+    byte rates of every interface except loopback.
+    wanted, if given, is called with 'network.connections' and
+    'network.addresses'; a part it declines is skipped and reported as None.
     """
     try:
-        # Get network I/O counters per interface
+        # Published counters never go backwards (psutil folds 32-bit wraps in);
+        # InterfaceRates reads the raw ones, as it tells wraps from resets itself
         net_io = psutil.net_io_counters(pernic=True)
+        raw_io = psutil.net_io_counters(pernic=True, nowrap=False)
         interfaces = {}
+        _interface_rates.smoothing_seconds = smoothing_seconds
+        rates = _interface_rates.update({
+            interface: tuple(getattr(stats, field) for field in RATE_FIELDS)
+            for interface, stats in raw_io.items()
+        })
+        totals = {'bytes_sent_per_sec': None, 'bytes_recv_per_sec': None}
 
         for interface, stats in net_io.items():
             interfaces[interface] = {
@@ -24,57 +138,40 @@ def get_network_metrics():
                 'errin': stats.errin,
                 'errout': stats.errout,
                 'dropin': stats.dropin,
-                'dropout': stats.dropout
+                'dropout': stats.dropout,
+                'rates': rates.get(interface) or dict.fromkeys(RATE_KEYS)
             }
+            if interface != 'lo':
+                for key in totals:
+                    rate = interfaces[interface]['rates'][key]
+                    if rate is not None:
+                        totals[key] = round((totals[key] or 0.0) + rate, 1)
 
-        # Get network connections count by status
-        try:
-            connections = psutil.net_connections()
-            connection_stats = {
-                'established': 0,
-                'listen': 0,
-                'time_wait': 0,
-                'close_wait': 0,
-                'total': len(connections)
-            }
-
-            for conn in connections:
-                status = conn.status.lower()
-                if status == 'established':
-                    connection_stats['established'] += 1
-                elif status == 'listen':
-                    connection_stats['listen'] += 1
-                elif status == 'time_wait':
-                    connection_stats['time_wait'] += 1
-                elif status == 'close_wait':
-                    connection_stats['close_wait'] += 1
-
-        except (psutil.AccessDenied, PermissionError):
-            # Some systems require root to access connection info
-            connection_stats = {
-                'error': 'Permission denied - run with elevated privileges to see connections',
-                'established': None,
-                'listen': None,
-                'time_wait': None,
-                'close_wait': None,
-                'total': None
-            }
+        # Count connections by state straight from /proc/net; psutil elsewhere
+        connection_stats = None
+        if wanted is None or wanted('network.connections'):
+            connection_stats = count_connections()
+            if connection_stats is None:
+                connection_stats = _psutil_connection_stats()
 
         # Get network addresses
-        addrs = psutil.net_if_addrs()
-        addresses = {}
-        for interface, addr_list in addrs.items():
-            addresses[interface] = []
-            for addr in addr_list:
-                addresses[interface].append({
-                    'family': str(addr.family),
-                    'address': addr.address,
-                    'netmask': addr.netmask,
-                    'broadcast': addr.broadcast
-                })
+        addresses = None
+        if wanted is None or wanted('network.addresses'):
+            addrs = psutil.net_if_addrs()
+            addresses = {}
+            for interface, addr_list in addrs.items():
+                addresses[interface] = []
+                for addr in addr_list:
+                    addresses[interface].append({
+                        'family': str(addr.family),
+                        'address': addr.address,
+                        'netmask': addr.netmask,
+                        'broadcast': addr.broadcast
+                    })
 
         return {
             'interfaces': interfaces,
+            'totals': totals,
             'connections': connection_stats,
             'addresses': addresses
         }
@@ -83,6 +180,7 @@ def get_network_metrics():
         return {
             'error': str(e),
             'interfaces': {},
+            'totals': {},
             'connections': {},
             'addresses': {}
         }
@@ -0,0 +1,260 @@
+"""
+Direct /proc process scanner
+Fast alternative to psutil.process_iter for hosts with thousands of processes.
+Only /proc/[pid]/stat is read: resident memory comes from its rss field, so
+statm would be a second read per process for nothing we use.
+"""
+import heapq
+import os
+import pwd
+import time
+from .concurrency import native_lock
+
+
+# Kernel state letters mapped to the psutil status names used elsewhere
+STATUS_NAMES = {
+    'R': 'running',
+    'S': 'sleeping',
+    'D': 'disk-sleep',
+    'Z': 'zombie',
+    'T': 'stopped',
+    't': 'tracing-stop',
+    'X': 'dead',
+    'x': 'dead',
+    'I': 'idle',
+    'K': 'wake-kill',
+    'W': 'waking',
+    'P': 'parked'
+}
+
+# Offsets of the fields we need within /proc/[pid]/stat, counted after the ") "
+# that closes the command name: state, utime, stime, starttime, rss (pages)
+_STATE, _UTIME, _STIME, _STARTTIME, _RSS = 0, 11, 12, 19, 21
+
+_STAT_BUFFER_SIZE = 1024
+
+
+def _read_boot_time(proc_root):
+    with open(os.path.join(proc_root, 'stat'), 'rb') as stat_file:
+        for line in stat_file:
+            if line.startswith(b'btime '):
+                return float(line.split()[1])
+    return time.time() - time.monotonic()
+
+
+def _read_mem_total(proc_root):
+    with open(os.path.join(proc_root, 'meminfo'), 'rb') as meminfo:
+        for line in meminfo:
+            if line.startswith(b'MemTotal:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+_usernames = {}
+
+
+def _username(uid):
+    name = _usernames.get(uid)
+    if name is None:
+        try:
+            name = pwd.getpwuid(uid).pw_name
+        except KeyError:
+            name = str(uid)
+        _usernames[uid] = name
+    return name
+
+
+class ProcScanner:
+    """
+    Scans /proc with one os.scandir pass, reading each /proc/[pid]/stat into a
+    reused buffer and keeping only plain numbers per process. The previous
+    scan's CPU ticks are kept per pid (with its start time, so recycled pids
+    reset) to compute CPU% over the interval between scans. Row dicts are only
+    built for processes that make one of the top-N lists; rows() for the whole
+    table reads each stat file again rather than keeping every raw line.
+    """
+
+    def __init__(self, proc_root='/proc'):
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.boot_time = _read_boot_time(proc_root)
+        self.mem_total = _read_mem_total(proc_root)
+        self._buffer = bytearray(_STAT_BUFFER_SIZE)
+        self._previous = {}
+        self._previous_at = None
+        self._lock = native_lock()
+
+    def _read_stat(self, pid_name):
+        """Raw /proc/[pid]/stat contents, or None if the process went away"""
+        try:
+            fd = os.open(f'{self.proc_root}/{pid_name}/stat', os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            size = os.readv(fd, [self._buffer])
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        return bytes(memoryview(self._buffer)[:size])
+
+    def _owner(self, pid):
+        try:
+            return _username(os.stat(f'{self.proc_root}/{pid}').st_uid)
+        except OSError:
+            return None
+
+    def _parse(self, raw, close):
+        """(comm, state, rss_pages, starttime) from a raw stat line"""
+        fields = raw[close + 2:].split(None, _RSS + 1)
+        comm = raw[raw.find(b'(') + 1:close].decode('utf-8', errors='replace')
+        return comm, fields[_STATE].decode(), int(fields[_RSS]), int(fields[_STARTTIME])
+
+    def _memory_percent(self, rss):
+        return round(rss / self.mem_total * 100, 1) if self.mem_total else 0.0
+
+    def _row(self, pid, comm, state, rss_pages, starttime, cpu_percent, now):
+        rss = rss_pages * self.page_size
+        create_time = self.boot_time + starttime / self.clock_ticks
+        return {
+            'pid': pid,
+            'name': comm,
+            'username': self._owner(pid),
+            'status': STATUS_NAMES.get(state, state),
+            'cpu_percent': round(cpu_percent, 1),
+            'memory_percent': self._memory_percent(rss),
+            'memory_rss': rss,
+            'uptime_seconds': int(now - create_time)
+        }
+
+    def scan(self, limit=10):
+        """Return (total, status_counts, top_cpu, top_memory) with the same row schema as get_process_metrics"""
+        with self._lock:
+            monotonic_now = time.monotonic()
+            now = time.time()
+            elapsed = monotonic_now - self._previous_at if self._previous_at else None
+            previous = self._previous
+            current = {}
+            state_counts = {}
+            top_cpu = []
+            top_memory = []
+            ticks_per_percent = self.clock_ticks / 100.0
+
+            with os.scandir(self.proc_root) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.isdigit():
+                        continue
+                    raw = self._read_stat(name)
+                    if raw is None:
+                        continue
+
+                    close = raw.rfind(b')')
+                    fields = raw[close + 2:].split(None, _RSS + 1)
+                    if len(fields) <= _RSS:
+                        continue
+                    state = fields[_STATE]
+                    state_counts[state] = state_counts.get(state, 0) + 1
+                    ticks = int(fields[_UTIME]) + int(fields[_STIME])
+                    starttime = int(fields[_STARTTIME])
+                    rss_pages = int(fields[_RSS])
+                    pid = int(name)
+
+                    before = previous.get(pid)
+                    if elapsed and before is not None and before[0] == starttime:
+                        cpu_percent = (ticks - before[1]) / ticks_per_percent / elapsed
+                    else:
+                        # First sighting: average over the process lifetime
+                        age = now - (self.boot_time + starttime / self.clock_ticks)
+                        cpu_percent = ticks / ticks_per_percent / max(age, 1.0)
+                    current[pid] = (starttime, ticks, cpu_percent)
+
+                    # Only candidates that beat the current N-th place get materialised
+                    if len(top_cpu) < limit:
+                        heapq.heappush(top_cpu, (cpu_percent, pid, raw, close))
+                    elif cpu_percent > top_cpu[0][0]:
+                        heapq.heapreplace(top_cpu, (cpu_percent, pid, raw, close))
+                    if len(top_memory) < limit:
+                        heapq.heappush(top_memory, (rss_pages, pid, raw, close, cpu_percent))
+                    elif rss_pages > top_memory[0][0]:
+                        heapq.heapreplace(top_memory, (rss_pages, pid, raw, close, cpu_percent))
+
+            self._previous = current
+            self._previous_at = monotonic_now
+
+        def build(raw, close, pid, cpu_percent):
+            return self._row(pid, *self._parse(raw, close), cpu_percent, now)
+
+        cpu_rows = [build(raw, close, pid, cpu) for cpu, pid, raw, close in sorted(top_cpu, reverse=True)]
+        memory_rows = [
+            build(raw, close, pid, cpu)
+            for _, pid, raw, close, cpu in sorted(top_memory, reverse=True)
+        ]
+        status_counts = {}
+        for state, count in state_counts.items():
+            status = STATUS_NAMES.get(state.decode(), state.decode())
+            status_counts[status] = status_counts.get(status, 0) + count
+        return len(current), status_counts, cpu_rows, memory_rows
+
+    def rows(self):
+        """Every process from the last scan as a compact row (process_monitor.PROCESS_ROW_FIELDS order)"""
+        rows = []
+        with self._lock:
+            for pid, (scanned_start, _, cpu_percent) in self._previous.items():
+                raw = self._read_stat(pid)
+                if raw is None:
+                    continue
+                try:
+                    comm, state, rss_pages, starttime = self._parse(raw, raw.rfind(b')'))
+                except (IndexError, ValueError):
+                    continue
+                if starttime != scanned_start:
+                    # The pid was reused since the scan
+                    continue
+                rss = rss_pages * self.page_size
+                rows.append([
+                    pid, comm, self._owner(pid), STATUS_NAMES.get(state, state),
+                    round(cpu_percent, 1), self._memory_percent(rss), rss,
+                    self.boot_time + starttime / self.clock_ticks
+                ])
+        return rows
+
+
+_scanner = None
+
+
+def get_proc_process_metrics(limit=10, proc_root='/proc'):
+    """
+    Same result as get_process_metrics, collected by scanning /proc directly.
+    """
+    global _scanner
+    try:
+        if _scanner is None or _scanner.proc_root != proc_root:
+            _scanner = ProcScanner(proc_root)
+        total, status_counts, top_cpu, top_memory = _scanner.scan(limit=limit)
+        return {
+            'summary': {
+                'total_processes': total,
+                'status_counts': status_counts
+            },
+            'top_cpu': top_cpu,
+            'top_memory': top_memory
+        }
+    except Exception as e:
+        return {
+            'error': str(e),
+            'summary': {
+                'total_processes': None,
+                'status_counts': {}
+            },
+            'top_cpu': [],
+            'top_memory': []
+        }
+
+
+def get_proc_process_rows():
+    """Compact rows for every process seen by the last get_proc_process_metrics scan"""
+    if _scanner is None:
+        return []
+    return _scanner.rows()
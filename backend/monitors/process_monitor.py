@@ -2,81 +2,151 @@
 Process monitoring module
 Collects top CPU and memory processes
 """
+import heapq
 import time
 import psutil
+from .concurrency import native_lock
 
 
-def _safe_cpu_percent(proc):
-    try:
-        return proc.cpu_percent(interval=None)
-    except (psutil.NoSuchProcess, psutil.AccessDenied):
-        return None
+PROCESS_ATTRS = [
+    'pid',
+    'name',
+    'username',
+    'status',
+    'create_time',
+    'cpu_times',
+    'memory_info',
+    'memory_percent'
+]
 
+# Column order of the compact rows handed to the process query index
+PROCESS_ROW_FIELDS = (
+    'pid', 'name', 'username', 'status',
+    'cpu_percent', 'memory_percent', 'memory_rss', 'create_time'
+)
 
-def get_process_metrics(limit=10):
+
+class ProcessEntry:
+    """One live process, updated in place on every table refresh"""
+
+    __slots__ = (
+        'pid', 'name', 'username', 'status', 'create_time',
+        'cpu_percent', 'memory_percent', 'memory_rss',
+        'cpu_total', 'sampled_at'
+    )
+
+    def __init__(self, pid, create_time):
+        self.pid = pid
+        self.create_time = create_time
+        self.cpu_total = None
+        self.sampled_at = None
+        self.cpu_percent = 0.0
+
+    def as_dict(self, now):
+        return {
+            'pid': self.pid,
+            'name': self.name,
+            'username': self.username,
+            'status': self.status,
+            'cpu_percent': round(self.cpu_percent, 1),
+            'memory_percent': round(self.memory_percent or 0.0, 1),
+            'memory_rss': self.memory_rss,
+            'uptime_seconds': int(now - (self.create_time or now))
+        }
+
+    def as_row(self):
+        return [
+            self.pid, self.name, self.username, self.status,
+            round(self.cpu_percent, 1), round(self.memory_percent or 0.0, 1),
+            self.memory_rss, self.create_time
+        ]
+
+
+class ProcessTable:
     """
-    Get process metrics including top CPU and memory usage.
-    Returns a dictionary with summary and top process lists.
+    Long-lived table of processes keyed by (pid, create_time), so a recycled pid
+    is never mistaken for the process that used to own it.
+    CPU% is the CPU time consumed since the previous refresh divided by the wall
+    time between refreshes, i.e. it covers the whole sampler tick without sleeping.
     """
-    try:
-        processes = []
-        for proc in psutil.process_iter([
-            'pid',
-            'name',
-            'username',
-            'status',
-            'create_time',
-            'memory_info',
-            'memory_percent'
-        ]):
-            processes.append(proc)
-
-        # Prime CPU percent for all processes
-        for proc in processes:
-            _safe_cpu_percent(proc)
-
-        time.sleep(0.1)
-
-        entries = []
-        status_counts = {}
-        now = time.time()
 
-        for proc in processes:
-            try:
-                info = proc.info
-                cpu_percent = _safe_cpu_percent(proc)
-                if cpu_percent is None:
+    def __init__(self):
+        self.entries = {}
+        self.status_counts = {}
+        self._lock = native_lock()
+
+    def update(self):
+        with self._lock:
+            now = time.monotonic()
+            wall_now = time.time()
+            seen = set()
+            status_counts = {}
+
+            for proc in psutil.process_iter(PROCESS_ATTRS):
+                try:
+                    info = proc.info
+                    key = (info['pid'], info.get('create_time'))
+                    entry = self.entries.get(key)
+                    if entry is None:
+                        entry = ProcessEntry(*key)
+                        self.entries[key] = entry
+
+                    cpu_times = info.get('cpu_times')
+                    cpu_total = cpu_times.user + cpu_times.system if cpu_times else None
+                    if cpu_total is not None:
+                        if entry.cpu_total is not None and now > entry.sampled_at:
+                            entry.cpu_percent = max(cpu_total - entry.cpu_total, 0.0) / (now - entry.sampled_at) * 100
+                        elif entry.create_time:
+                            # First sighting: average over the process lifetime
+                            entry.cpu_percent = cpu_total / max(wall_now - entry.create_time, 1.0) * 100
+                        entry.cpu_total = cpu_total
+                        entry.sampled_at = now
+
+                    mem_info = info.get('memory_info')
+                    entry.name = info.get('name')
+                    entry.username = info.get('username')
+                    entry.status = info.get('status')
+                    entry.memory_percent = info.get('memory_percent')
+                    entry.memory_rss = mem_info.rss if mem_info else None
+
+                    seen.add(key)
+                    status_counts[entry.status] = status_counts.get(entry.status, 0) + 1
+                except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
                     continue
 
-                status = info.get('status')
-                status_counts[status] = status_counts.get(status, 0) + 1
+            # Evict processes that have exited
+            for key in [key for key in self.entries if key not in seen]:
+                del self.entries[key]
+            self.status_counts = status_counts
 
-                mem_info = info.get('memory_info')
-                mem_rss = mem_info.rss if mem_info else None
+    def rows(self):
+        with self._lock:
+            return list(self.entries.values()), dict(self.status_counts)
 
-                entries.append({
-                    'pid': info.get('pid'),
-                    'name': info.get('name'),
-                    'username': info.get('username'),
-                    'status': status,
-                    'cpu_percent': round(cpu_percent, 1),
-                    'memory_percent': round(info.get('memory_percent') or 0.0, 1),
-                    'memory_rss': mem_rss,
-                    'uptime_seconds': int(now - info.get('create_time', now))
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
-                continue
 
-        top_cpu = sorted(entries, key=lambda item: item['cpu_percent'], reverse=True)[:limit]
-        top_memory = sorted(entries, key=lambda item: item['memory_percent'], reverse=True)[:limit]
+_process_table = ProcessTable()
+
+
+def get_process_metrics(limit=10):
+    """
+    Get process metrics including top CPU and memory usage.
+    Returns a dictionary with summary and top process lists.
+    """
+    try:
+        _process_table.update()
+        entries, status_counts = _process_table.rows()
+        now = time.time()
+
+        top_cpu = heapq.nlargest(limit, entries, key=lambda entry: entry.cpu_percent)
+        top_memory = heapq.nlargest(limit, entries, key=lambda entry: entry.memory_percent or 0.0)
 
         return {
             'summary': {
-                'total_processes': len(psutil.pids()),
+                'total_processes': len(entries),
                 'status_counts': status_counts
             },
-            'top_cpu': top_cpu,
-            'top_memory': top_memory
+            'top_cpu': [entry.as_dict(now) for entry in top_cpu],
+            'top_memory': [entry.as_dict(now) for entry in top_memory]
         }
     except Exception as e:
         return {
@@ -88,3 +158,12 @@ def get_process_metrics(limit=10):
             'top_cpu': [],
             'top_memory': []
         }
+
+
+def get_process_rows():
+    """
+    Every process in the table as a compact row (see PROCESS_ROW_FIELDS),
+    as of the last get_process_metrics refresh.
+    """
+    entries, _ = _process_table.rows()
+    return [entry.as_row() for entry in entries]
@@ -2,11 +2,18 @@
 Security monitoring module
 Collects login activity and authentication events
 """
+import json
 import os
 import re
 import subprocess
 import shutil
-from collections import deque, Counter
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple, Counter
+from datetime import datetime
+from .concurrency import native_lock, on_main_hub
+from .utmp import UtmpSessions, WtmpReader
 
 
 AUTH_LOG_PATHS = [
@@ -15,13 +22,32 @@ AUTH_LOG_PATHS = [
 ]
 
 
-FAILED_PATTERNS = [
-    re.compile(r'Failed password for (invalid user )?(?P<user>\\S+) from (?P<ip>\\S+)'),
-    re.compile(r'Invalid user (?P<user>\\S+) from (?P<ip>\\S+)')
-]
+# Anchored patterns, applied with match() at the offset of the keyword found by
+# classify_line. It looks for the keywords with str.find, one pass per keyword
+# until one is found (five for an unrelated line), and runs at most one regex.
+FAILED_PATTERN = re.compile(r'Failed password for (?P<invalid>invalid user )?(?P<user>\S+) from (?P<ip>\S+)')
+INVALID_USER_PATTERN = re.compile(r'Invalid user (?P<user>\S*) from (?P<ip>\S+)')
+ACCEPTED_PATTERN = re.compile(r'Accepted (?P<method>\S+) for (?P<user>\S+) from (?P<ip>\S+)')
+SESSION_PATTERN = re.compile(r'session opened for user (?P<user>[^\s(]+)')
+SUDO_PATTERN = re.compile(r'sudo:\s*(?P<user>\S+)')
+COMMAND_PATTERN = re.compile(r'COMMAND=(?P<command>[^;]+)$')
+
+MONTHS = {
+    name: index for index, name in enumerate(
+        ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], 1
+    )
+}
+
+AuthEvent = namedtuple('AuthEvent', ['kind', 'time', 'timestamp', 'user', 'ip', 'detail', 'message'])
 
-ACCEPTED_PATTERN = re.compile(r'Accepted \\S+ for (?P<user>\\S+) from (?P<ip>\\S+)')
-SESSION_PATTERN = re.compile(r'session opened for user (?P<user>\\S+)')
+# Journal identifiers carrying auth events when there is no auth log file
+JOURNAL_IDENTIFIERS = ['sshd', 'sshd-session', 'sudo', 'su', 'login']
+
+# How far back to start when an auth log is first opened (roughly 5000 lines)
+INITIAL_TAIL_BYTES = 512 * 1024
+READ_CHUNK_BYTES = 1024 * 1024
+EVENT_HISTORY = 1000
+TOP_IP_WINDOW = 5000
 
 def _find_command(name, fallbacks):
     cmd = shutil.which(name)
@@ -33,230 +59,440 @@ def _find_command(name, fallbacks):
     return None
 
 
-def _read_log_tail(paths, max_lines=2000):
-    for path in paths:
-        if not os.path.exists(path):
-            continue
-        try:
-            with open(path, 'r', errors='ignore') as log_file:
-                return list(deque(log_file, maxlen=max_lines)), None, path
-        except PermissionError:
-            return [], f'Permission denied reading {path}', path
-        except Exception as e:
-            return [], str(e), path
-    return None, None, None
-
-
-def _read_journal_tail(max_lines=2000):
-    journalctl = _find_command('journalctl', ['/bin/journalctl', '/usr/bin/journalctl'])
-    if not journalctl:
-        return [], 'journalctl not found', None
+def _journal_line(entry):
+    """Render a journal JSON entry as a syslog-style line with an exact RFC 3339 timestamp"""
+    message = entry.get('MESSAGE')
+    if isinstance(message, list):
+        # Non-UTF-8 messages are exported as byte arrays
+        message = bytes(message).decode('utf-8', errors='ignore')
+    if not message:
+        return None
     try:
-        result = subprocess.run(
-            [
-                journalctl,
-                '-n',
-                str(max_lines),
-                '--no-pager',
-                '--output',
-                'short',
-                '-t',
-                'sshd',
-                '-t',
-                'sudo'
-            ],
-            capture_output=True,
-            text=True,
-            timeout=3
-        )
-        if result.returncode != 0 or not result.stdout.strip():
-            result = subprocess.run(
-                [journalctl, '-n', str(max_lines), '--no-pager', '--output', 'short'],
-                capture_output=True,
-                text=True,
-                timeout=3
-            )
+        realtime = int(entry['__REALTIME_TIMESTAMP']) / 1_000_000
+        timestamp = datetime.fromtimestamp(realtime).astimezone().isoformat()
+    except (KeyError, ValueError):
+        timestamp = datetime.now().astimezone().isoformat()
+    identifier = entry.get('SYSLOG_IDENTIFIER', 'journal')
+    pid = entry.get('_PID') or entry.get('SYSLOG_PID')
+    source = f"{identifier}[{pid}]" if pid else identifier
+    return f"{timestamp} {entry.get('_HOSTNAME', '-')} {source}: {message}"
+
+
+class JournalSource:
+    """
+    Incremental journald reader.
+    Remembers the __CURSOR of the last entry it handled and only asks journalctl
+    for entries after it. With follow=True a single long-lived
+    `journalctl -f --output=json` process feeds new entries as they are logged,
+    so refreshes cost nothing while the journal is quiet; it is restarted from
+    the last cursor if it exits.
+    """
 
+    def __init__(self, journalctl=None, identifiers=JOURNAL_IDENTIFIERS,
+                 initial_lines=5000, follow=True, timeout=3):
+        self.journalctl = journalctl
+        self.identifiers = identifiers
+        self.initial_lines = initial_lines
+        self.follow = follow
+        self.timeout = timeout
+        self.cursor = None
+        self.error = None
+        self._process = None
+        self._thread = None
+        self._restart_delay = 1
+        self._lock = threading.Lock()
+
+    def _command(self, follow):
+        args = [self.journalctl, '--no-pager', '--output=json']
+        for identifier in self.identifiers:
+            args.extend(['-t', identifier])
+        if self.cursor:
+            args.append(f'--after-cursor={self.cursor}')
+        else:
+            args.extend(['-n', str(self.initial_lines)])
+        if follow:
+            args.append('-f')
+        return args
+
+    def _handle(self, raw, ingest):
+        raw = raw.strip()
+        if not raw:
+            return
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            # journalctl reports problems as plain text
+            self.error = raw
+            return
+        self.error = None
+        line = _journal_line(entry)
+        if line:
+            ingest([line])
+        if entry.get('__CURSOR'):
+            self.cursor = entry['__CURSOR']
+
+    def _read_once(self, ingest):
+        try:
+            result = on_main_hub(
+                subprocess.run, self._command(follow=False), capture_output=True, text=True, timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return 'journalctl timed out'
         if result.returncode != 0:
-            return [], result.stderr.strip() or 'Failed to read journal', 'journalctl'
+            return result.stderr.strip() or 'Failed to read journal'
+        lines = []
+        for raw in result.stdout.splitlines():
+            self._handle(raw, lines.extend)
+        ingest(lines)
+        return None
 
-        return result.stdout.splitlines(), None, 'journalctl'
-    except subprocess.TimeoutExpired:
-        return [], 'journalctl timed out', 'journalctl'
-    except Exception as e:
-        return [], str(e), 'journalctl'
+    def _run_follower(self, ingest):
+        while self._thread is threading.current_thread():
+            # stderr only carries hints while journalctl runs; it is read once it exits
+            with tempfile.TemporaryFile(mode='w+') as stderr:
+                try:
+                    process = subprocess.Popen(
+                        self._command(follow=True),
+                        stdout=subprocess.PIPE,
+                        stderr=stderr,
+                        text=True,
+                        bufsize=1
+                    )
+                except OSError as e:
+                    self.error = str(e)
+                    return
+                self._process = process
+                for raw in process.stdout:
+                    self._handle(raw, ingest)
+                    self._restart_delay = 1
+                process.wait()
+                if self._thread is not threading.current_thread():
+                    return
+                stderr.seek(0)
+                self.error = stderr.read().strip() or f'journalctl exited with status {process.returncode}'
+            time.sleep(self._restart_delay)
+            self._restart_delay = min(self._restart_delay * 2, 60)
+
+    def poll(self, ingest):
+        """Feed new journal lines to ingest(lines); returns an error message or None"""
+        if self.journalctl is None:
+            self.journalctl = _find_command('journalctl', ['/bin/journalctl', '/usr/bin/journalctl'])
+            if self.journalctl is None:
+                return 'journalctl not found'
+
+        with self._lock:
+            if not self.follow:
+                try:
+                    self.error = self._read_once(ingest)
+                except Exception as e:
+                    self.error = str(e)
+                return self.error
+
+            if self._thread is None or not self._thread.is_alive():
+                self.error = None
+                self._thread = threading.Thread(
+                    target=self._run_follower,
+                    args=(ingest,),
+                    name='pivitals-journal',
+                    daemon=True
+                )
+                on_main_hub(self._thread.start)
+            return self.error
+
+    def stop(self):
+        with self._lock:
+            self._thread = None
+            process, self._process = self._process, None
+        if process and process.poll() is None:
+            process.terminate()
 
 
 def _parse_syslog_timestamp(line):
-    parts = line.split()
-    if not parts:
+    if line[:4].isdigit():
+        # RFC 3339 timestamp (rsyslog high-precision format)
+        end = line.find(' ')
+        return line[:end] if end > 0 else None
+    if len(line) < 15 or line[3] != ' ':
         return None
-    if parts[0][:4].isdigit() and 'T' in parts[0]:
-        return parts[0]
-    if len(parts) < 3:
+    # Classic "Mmm dd HH:MM:SS"
+    return line[:15]
+
+
+_time_cache = {}
+
+
+def _parse_event_time(timestamp):
+    """Unix time for a syslog timestamp; classic timestamps are assumed to be within the last year"""
+    if timestamp is None:
         return None
-    return f"{parts[0]} {parts[1]} {parts[2]}"
-
-
-def _parse_failed_logins(lines, limit=10):
-    entries = []
-    ip_counter = Counter()
-
-    for line in lines:
-        if 'Failed password' not in line and 'Invalid user' not in line:
-            continue
-        for pattern in FAILED_PATTERNS:
-            match = pattern.search(line)
-            if match:
-                user = match.group('user')
-                ip_addr = match.group('ip')
-                ip_counter[ip_addr] += 1
-                entries.append({
-                    'timestamp': _parse_syslog_timestamp(line),
-                    'user': user,
-                    'ip': ip_addr,
-                    'message': line.strip()
-                })
-                break
-
-    entries = entries[-limit:]
-    top_ips = [{'ip': ip_addr, 'count': count} for ip_addr, count in ip_counter.most_common(5)]
-
-    return entries, top_ips
-
-
-def _parse_sudo_events(lines, limit=10):
-    entries = []
-    for line in lines:
-        if 'sudo:' not in line or 'COMMAND=' not in line:
-            continue
-        timestamp = _parse_syslog_timestamp(line)
-        user_match = re.search(r'^(\\w+)', line.split('sudo:')[-1].strip())
-        command_match = re.search(r'COMMAND=([^;]+)$', line.strip())
-        entries.append({
-            'timestamp': timestamp,
-            'user': user_match.group(1) if user_match else None,
-            'command': command_match.group(1).strip() if command_match else None,
-            'message': line.strip()
-        })
-    return entries[-limit:]
-
-
-def _parse_success_logins(lines, limit=10):
-    entries = []
-    for line in lines:
-        if 'Accepted ' in line:
-            match = ACCEPTED_PATTERN.search(line)
-            if match:
-                entries.append({
-                    'timestamp': _parse_syslog_timestamp(line),
-                    'user': match.group('user'),
-                    'ip': match.group('ip'),
-                    'message': line.strip()
-                })
-                continue
-        if 'session opened for user' in line:
-            match = SESSION_PATTERN.search(line)
-            if match:
-                entries.append({
-                    'timestamp': _parse_syslog_timestamp(line),
-                    'user': match.group('user'),
-                    'ip': None,
-                    'message': line.strip()
-                })
-    return entries[-limit:]
-
-
-def _parse_last_line(line):
-    line = line.strip()
-    if not line or line.startswith('wtmp begins'):
+    cached = _time_cache.get(timestamp)
+    if cached is not None:
+        return cached
+    try:
+        if timestamp[:4].isdigit():
+            value = datetime.fromisoformat(timestamp).timestamp()
+        else:
+            month = MONTHS[timestamp[:3]]
+            day = int(timestamp[4:6])
+            hour, minute, second = (int(part) for part in timestamp[7:15].split(':'))
+            now = datetime.now()
+            parsed = datetime(now.year, month, day, hour, minute, second)
+            if parsed > now.replace(microsecond=0) and (parsed - now).days > 0:
+                parsed = parsed.replace(year=now.year - 1)
+            value = parsed.timestamp()
+    except (KeyError, ValueError):
+        return None
+    if len(_time_cache) > 4096:
+        _time_cache.clear()
+    _time_cache[timestamp] = value
+    return value
+
+
+def _event(kind, line, user, ip_addr=None, detail=None):
+    timestamp = _parse_syslog_timestamp(line)
+    return AuthEvent(kind, _parse_event_time(timestamp), timestamp, user, ip_addr, detail, line.strip())
+
+
+def classify_line(line):
+    """
+    Classify one auth log line by its first matching keyword.
+    Returns an AuthEvent with kind 'failed', 'invalid_user', 'accepted',
+    'session' or 'sudo', or None for lines that are none of these.
+    """
+    index = line.find('sudo:')
+    if index >= 0:
+        command_index = line.find('COMMAND=', index)
+        if command_index >= 0:
+            user = SUDO_PATTERN.match(line, index)
+            command = COMMAND_PATTERN.search(line.rstrip(), command_index)
+            return _event(
+                'sudo',
+                line,
+                user.group('user') if user else None,
+                detail=command.group('command').strip() if command else None
+            )
+
+    index = line.find('Failed password for ')
+    if index >= 0:
+        match = FAILED_PATTERN.match(line, index)
+        if match:
+            kind = 'invalid_user' if match.group('invalid') else 'failed'
+            return _event(kind, line, match.group('user'), match.group('ip'))
         return None
-    tokens = line.split()
-    if not tokens:
+
+    index = line.find('Invalid user ')
+    if index >= 0:
+        match = INVALID_USER_PATTERN.match(line, index)
+        if match:
+            return _event('invalid_user', line, match.group('user'), match.group('ip'))
         return None
-    if tokens[0] in ('reboot', 'shutdown', 'runlevel'):
+
+    index = line.find('Accepted ')
+    if index >= 0:
+        match = ACCEPTED_PATTERN.match(line, index)
+        if match:
+            return _event('accepted', line, match.group('user'), match.group('ip'), match.group('method'))
         return None
-    if '-' not in tokens:
-        return {'raw': line}
-
-    dash_index = tokens.index('-')
-    if dash_index < 3:
-        return {'raw': line}
-
-    user = tokens[0]
-    tty = tokens[1]
-    login = f"{tokens[dash_index - 2]} {tokens[dash_index - 1]}"
-    host_tokens = tokens[2:dash_index - 2]
-    host = " ".join(host_tokens).strip() or None
-
-    logout_tokens = tokens[dash_index + 1:]
-    still_logged_in = False
-    logout = None
-    duration = None
-
-    if len(logout_tokens) >= 3 and logout_tokens[:3] == ['still', 'logged', 'in']:
-        still_logged_in = True
-    elif len(logout_tokens) >= 2:
-        logout = f"{logout_tokens[0]} {logout_tokens[1]}"
-
-    for token in logout_tokens:
-        if token.startswith('(') and token.endswith(')'):
-            duration = token.strip('()')
-            break
 
-    return {
-        'user': user,
-        'tty': tty,
-        'host': host,
-        'login': login,
-        'logout': logout,
-        'duration': duration,
-        'still_logged_in': still_logged_in,
-        'raw': line
+    index = line.find('session opened for user ')
+    if index >= 0:
+        match = SESSION_PATTERN.match(line, index)
+        if match:
+            return _event('session', line, match.group('user'))
+    return None
+
+
+def _event_entry(event):
+    """API representation of an event, keeping the original per-list fields"""
+    entry = {
+        'kind': event.kind,
+        'timestamp': event.timestamp,
+        'time': event.time,
+        'user': event.user,
+        'message': event.message
     }
+    if event.kind == 'sudo':
+        entry['command'] = event.detail
+    else:
+        entry['ip'] = event.ip
+    return entry
+
+
+class AuthEventStore:
+    """
+    Rolling in-memory view of parsed auth events.
+    Top IPs are counted over the last TOP_IP_WINDOW failed attempts.
+    Failure totals only ever grow: after clear() (a reopened log or a new
+    source re-reading its initial tail) events no newer than the last one
+    already counted are not counted again.
+    """
+
+    def __init__(self, maxlen=EVENT_HISTORY, ip_window=TOP_IP_WINDOW):
+        self.failed = deque(maxlen=maxlen)
+        self.sudo = deque(maxlen=maxlen)
+        self.logins = deque(maxlen=maxlen)
+        self.ip_counts = Counter()
+        self._ip_window = deque()
+        self._ip_window_size = ip_window
+        self.failure_totals = Counter()
+        self._newest_failure = None
+        self._counted_until = None
+        # Sources may feed events from a follower thread
+        self._lock = native_lock()
+
+    def ingest(self, lines):
+        if not lines:
+            return
+        events = [event for event in map(classify_line, lines) if event is not None]
+        with self._lock:
+            for event in events:
+                self._add(event)
+
+    def _add(self, event):
+        kind = event.kind
+        if kind == 'failed' or kind == 'invalid_user':
+            self.failed.append(event)
+            self._count_ip(event.ip)
+            self._count_failure(event)
+        elif kind == 'sudo':
+            self.sudo.append(event)
+        else:
+            self.logins.append(event)
+
+    def _count_ip(self, ip_addr):
+        self._ip_window.append(ip_addr)
+        self.ip_counts[ip_addr] += 1
+        if len(self._ip_window) > self._ip_window_size:
+            expired = self._ip_window.popleft()
+            self.ip_counts[expired] -= 1
+            if self.ip_counts[expired] <= 0:
+                del self.ip_counts[expired]
+
+    def _count_failure(self, event):
+        if self._counted_until is not None and (event.time is None or event.time <= self._counted_until):
+            return
+        self.failure_totals[event.kind] += 1
+        if event.time is not None and (self._newest_failure is None or event.time > self._newest_failure):
+            self._newest_failure = event.time
+
+    def clear(self):
+        with self._lock:
+            self._counted_until = self._newest_failure
+            self.failed.clear()
+            self.sudo.clear()
+            self.logins.clear()
+            self.ip_counts.clear()
+            self._ip_window.clear()
+
+    def recent(self, name, limit):
+        """Newest `limit` events of one list ('failed', 'sudo' or 'logins'), oldest first"""
+        with self._lock:
+            events = getattr(self, name)
+            return list(events)[-limit:] if limit else []
+
+    def totals(self):
+        """Failed attempts counted since start, by kind"""
+        with self._lock:
+            return {kind: self.failure_totals[kind] for kind in ('failed', 'invalid_user')}
+
+    def top_ips(self, count=5):
+        with self._lock:
+            return [{'ip': ip_addr, 'count': hits} for ip_addr, hits in self.ip_counts.most_common(count)]
+
+
+class AuthLogTailer:
+    """
+    Follows the first existing auth log by inode and byte offset.
+    Each read returns only lines appended since the previous one. A changed inode
+    (logrotate create) drains the old file before switching; a shrinking file
+    (copytruncate) restarts from the beginning.
+    """
+
+    def __init__(self, paths, initial_bytes=INITIAL_TAIL_BYTES):
+        self.paths = paths
+        self.initial_bytes = initial_bytes
+        self.path = None
+        self._file = None
+        self._inode = None
+        self._partial = b''
+        self._lock = threading.Lock()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._inode = None
+        self._partial = b''
+
+    def _open(self, path, from_start):
+        log_file = open(path, 'rb')
+        stat = os.fstat(log_file.fileno())
+        self.path = path
+        self._file = log_file
+        self._inode = stat.st_ino
+        self._partial = b''
+        if not from_start and stat.st_size > self.initial_bytes:
+            log_file.seek(stat.st_size - self.initial_bytes)
+            # Drop the partial line we landed in
+            log_file.readline()
+
+    def _drain(self, ingest):
+        while True:
+            chunk = self._file.read(READ_CHUNK_BYTES)
+            if not chunk:
+                return
+            chunk = self._partial + chunk
+            complete, _, self._partial = chunk.rpartition(b'\n')
+            if complete:
+                ingest(complete.decode('utf-8', errors='ignore').splitlines())
+
+    def read_new(self, ingest):
+        """
+        Feed newly appended lines to ingest(lines).
+        Returns (error, path); path is None when no auth log exists.
+        """
+        with self._lock:
+            path = next((candidate for candidate in self.paths if os.path.exists(candidate)), None)
+            if path is None:
+                self._close()
+                self.path = None
+                return None, None
+
+            try:
+                if self._file is None or path != self.path:
+                    self._close()
+                    self._open(path, from_start=False)
+                    ingest(None)
+                else:
+                    stat = os.stat(path)
+                    if stat.st_ino != self._inode:
+                        # Rotated: finish the old file, then follow the new one from the start
+                        self._drain(ingest)
+                        self._close()
+                        self._open(path, from_start=True)
+                    elif stat.st_size < self._file.tell():
+                        # Truncated in place
+                        self._file.seek(0)
+                        self._partial = b''
+                self._drain(ingest)
+                return None, path
+            except PermissionError:
+                self._close()
+                return f'Permission denied reading {path}', path
+            except Exception as e:
+                self._close()
+                return str(e), path
 
 
 def get_current_sessions():
-    who_cmd = _find_command('who', ['/bin/who', '/usr/bin/who'])
-    if not who_cmd:
+    try:
         return {
-            'error': 'who command not found',
-            'sessions': []
+            'sessions': _utmp_sessions.sessions()
         }
-    try:
-        result = subprocess.run(
-            [who_cmd],
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-        if result.returncode != 0:
-            return {
-                'error': result.stderr.strip() or 'Failed to read sessions',
-                'sessions': []
-            }
-
-        sessions = []
-        for line in result.stdout.strip().splitlines():
-            parts = line.split()
-            if len(parts) < 4:
-                continue
-            user = parts[0]
-            tty = parts[1]
-            login_time = f"{parts[2]} {parts[3]}"
-            host = None
-            if len(parts) > 4:
-                host = " ".join(parts[4:]).strip()
-                host = host.strip('()')
-            sessions.append({
-                'user': user,
-                'tty': tty,
-                'login_time': login_time,
-                'host': host
-            })
-
+    except FileNotFoundError:
         return {
-            'sessions': sessions
+            'error': 'utmp not found - current sessions unavailable',
+            'sessions': []
         }
     except Exception as e:
         return {
@@ -266,56 +502,16 @@ def get_current_sessions():
 
 
 def get_recent_logins(limit=10):
-    last_cmd = _find_command('last', ['/bin/last', '/usr/bin/last'])
-    if not last_cmd:
-        return {
-            'error': None,
-            'entries': [],
-            'available': False
-        }
     try:
-        raw_only = False
-        result = subprocess.run(
-            [last_cmd, '-n', str(limit), '--time-format', 'iso'],
-            capture_output=True,
-            text=True,
-            timeout=3
-        )
-        if result.returncode != 0:
-            if 'time-format' in result.stderr:
-                raw_only = True
-                result = subprocess.run(
-                    [last_cmd, '-n', str(limit)],
-                    capture_output=True,
-                    text=True,
-                    timeout=3
-                )
-
-        if result.returncode != 0:
-            return {
-                'error': result.stderr.strip() or 'Failed to read login history',
-                'entries': []
-            }
-
-        entries = []
-        for line in result.stdout.splitlines():
-            if raw_only:
-                if line.strip() and not line.startswith('wtmp begins'):
-                    entries.append({'raw': line.strip()})
-                continue
-            parsed = _parse_last_line(line)
-            if parsed:
-                entries.append(parsed)
-
         return {
-            'entries': entries[:limit],
+            'entries': _wtmp_reader.recent(limit),
             'available': True
         }
-    except subprocess.TimeoutExpired:
+    except FileNotFoundError:
         return {
-            'error': 'last command timed out',
+            'error': None,
             'entries': [],
-            'available': True
+            'available': False
         }
     except Exception as e:
         return {
@@ -325,18 +521,48 @@ def get_recent_logins(limit=10):
         }
 
 
+_utmp_sessions = UtmpSessions()
+_wtmp_reader = WtmpReader()
+_auth_events = AuthEventStore()
+_auth_tailer = AuthLogTailer(AUTH_LOG_PATHS)
+_journal_source = JournalSource()
+_active_source = {'name': None}
+
+
+def _ingest_auth_lines(lines):
+    # None marks a (re)opened log: start over from its initial tail
+    if lines is None:
+        _auth_events.clear()
+        return
+    _auth_events.ingest(lines)
+
+
+def _switch_source(name):
+    if _active_source['name'] != name:
+        _active_source['name'] = name
+        _auth_events.clear()
+        if name != 'journal':
+            _journal_source.stop()
+            _journal_source.cursor = None
+
+
 def get_security_metrics(login_limit=10, failed_limit=10, sudo_limit=10):
     """
     Aggregate security-related metrics: sessions, logins, failed attempts, sudo.
     """
-    auth_lines, auth_error, auth_path = _read_log_tail(AUTH_LOG_PATHS, max_lines=5000)
-    if auth_lines is None:
-        auth_lines, auth_error, auth_path = _read_journal_tail(max_lines=5000)
+    if any(os.path.exists(path) for path in AUTH_LOG_PATHS):
+        _switch_source('file')
+        auth_error, auth_path = _auth_tailer.read_new(_ingest_auth_lines)
+    else:
+        _switch_source('journal')
+        auth_path = 'journalctl'
+        auth_error = _journal_source.poll(_auth_events.ingest)
         if auth_error:
             auth_error = f'Auth log file not found and journal unavailable: {auth_error}'
-    failed_logins, top_ips = _parse_failed_logins(auth_lines, limit=failed_limit)
-    sudo_events = _parse_sudo_events(auth_lines, limit=sudo_limit)
-    auth_recent_logins = _parse_success_logins(auth_lines, limit=login_limit)
+    failed_logins = [_event_entry(event) for event in _auth_events.recent('failed', failed_limit)]
+    top_ips = _auth_events.top_ips()
+    sudo_events = [_event_entry(event) for event in _auth_events.recent('sudo', sudo_limit)]
+    auth_recent_logins = [_event_entry(event) for event in _auth_events.recent('logins', login_limit)]
 
     current_sessions = get_current_sessions()
     recent_logins = get_recent_logins(limit=login_limit)
@@ -359,7 +585,8 @@ def get_security_metrics(login_limit=10, failed_limit=10, sudo_limit=10):
         'failed_logins': failed_logins,
         'failed_login_summary': {
             'total': len(failed_logins),
-            'top_ips': top_ips
+            'top_ips': top_ips,
+            'totals': _auth_events.totals()
         },
         'sudo_events': sudo_events,
         'auth_log_path': auth_path,
@@ -5,6 +5,9 @@ Collects systemd service status information
 import subprocess
 import shutil
 import os
+from .concurrency import on_main_hub
+from .cgroup_monitor import DEFAULT_CGROUP_ROOT, get_service_usage, top_service_usage
+from .systemd_units import start_unit_watcher
 
 
 def _parse_systemctl_output(output):
@@ -37,41 +40,71 @@ def _normalize_service_name(name):
     return name
 
 
-def get_service_metrics(limit=15, watched=None):
-    """
-    Get systemd service metrics.
-    Returns a dictionary with summary, failed services, and watched services.
-    """
+def _systemctl_path():
     systemctl_path = shutil.which('systemctl')
     if not systemctl_path:
         for candidate in ['/bin/systemctl', '/usr/bin/systemctl']:
             if os.path.exists(candidate):
-                systemctl_path = candidate
-                break
-    if not systemctl_path:
-        return {
-            'error': 'systemctl not found - service monitoring unavailable',
-            'summary': {},
-            'failed': [],
-            'watched': []
-        }
+                return candidate
+    return systemctl_path
 
+
+def _list_units_systemctl():
+    """Return (services, error) from one systemctl list-units call"""
+    systemctl_path = _systemctl_path()
+    if not systemctl_path:
+        return None, 'systemctl not found - service monitoring unavailable'
     try:
-        result = subprocess.run(
+        result = on_main_hub(
+            subprocess.run,
             [systemctl_path, 'list-units', '--type=service', '--all', '--no-pager', '--no-legend'],
             capture_output=True,
             text=True,
             timeout=3
         )
-        if result.returncode != 0:
-            return {
-                'error': result.stderr.strip() or 'Failed to query systemctl',
-                'summary': {},
-                'failed': [],
-                'watched': []
-            }
-
-        services = _parse_systemctl_output(result.stdout)
+    except subprocess.TimeoutExpired:
+        return None, 'systemctl timed out'
+    if result.returncode != 0:
+        return None, result.stderr.strip() or 'Failed to query systemctl'
+    return _parse_systemctl_output(result.stdout), None
+
+
+_unit_watcher = None
+
+
+def get_service_metrics(limit=15, watched=None, cgroup_root=DEFAULT_CGROUP_ROOT, dbus_bus=None, on_change=None,
+                        rate_window=0.0):
+    """
+    Get systemd service metrics.
+    Returns a dictionary with summary, failed services, and watched services.
+    Watched and running services carry live CPU/memory/IO usage from their
+    cgroup under cgroup_root ('resources' is None where it is unavailable),
+    with rates measured over at least rate_window seconds.
+
+    With dbus_bus ('SYSTEM' or a bus address) units come from an in-memory
+    table kept current by systemd's D-Bus signals, and on_change is called
+    whenever it changes; systemctl is used until the table is ready or
+    whenever D-Bus is unavailable.
+    """
+    global _unit_watcher
+    if dbus_bus and _unit_watcher is None:
+        _unit_watcher = start_unit_watcher(bus=dbus_bus, on_change=on_change)
+
+    try:
+        if _unit_watcher is not None and _unit_watcher.ready:
+            services = sorted(_unit_watcher.units(), key=lambda service: service['name'])
+            source = 'dbus'
+        else:
+            services, error = _list_units_systemctl()
+            source = 'systemctl'
+            if error:
+                return {
+                    'error': error,
+                    'summary': {},
+                    'failed': [],
+                    'watched': []
+                }
+
         summary = {
             'total': len(services),
             'active': 0,
@@ -99,18 +132,18 @@ def get_service_metrics(limit=15, watched=None):
 
         running_services = [svc for svc in services if svc['active_state'] == 'active'][:limit]
 
+        usage = get_service_usage(cgroup_root, min_window=rate_window)
+        for service in watched_services + running_services:
+            service['resources'] = usage.get(service['name'])
+
         return {
             'summary': summary,
             'failed': failed_services,
             'watched': watched_services,
-            'running_sample': running_services
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            'error': 'systemctl timed out',
-            'summary': {},
-            'failed': [],
-            'watched': []
+            'running_sample': running_services,
+            'top_cpu': top_service_usage(usage, limit, 'cpu_percent'),
+            'top_memory': top_service_usage(usage, limit, 'memory_bytes'),
+            'source': source
         }
     except Exception as e:
         return {
@@ -0,0 +1,229 @@
+"""
+systemd unit table
+Mirrors service unit states from systemd's D-Bus change notifications
+"""
+import socket
+import threading
+from .concurrency import native_lock, on_main_hub
+
+try:
+    from jeepney import DBusAddress, HeaderFields, MatchRule, MessageType, new_method_call
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    open_dbus_connection = None
+
+
+SYSTEMD_BUS_NAME = 'org.freedesktop.systemd1'
+SYSTEMD_PATH = '/org/freedesktop/systemd1'
+MANAGER_INTERFACE = 'org.freedesktop.systemd1.Manager'
+UNIT_INTERFACE = 'org.freedesktop.systemd1.Unit'
+PROPERTIES_INTERFACE = 'org.freedesktop.DBus.Properties'
+
+# D-Bus property name -> unit table field
+UNIT_PROPERTIES = {
+    'Id': 'name',
+    'Description': 'description',
+    'LoadState': 'load_state',
+    'ActiveState': 'active_state',
+    'SubState': 'sub_state'
+}
+
+CALL_TIMEOUT = 5.0
+RECEIVE_TIMEOUT = 1.0
+MAX_RECONNECT_DELAY = 30.0
+SIGNAL_BUFFER = 10000
+
+
+class DBusCallError(RuntimeError):
+    """systemd answered a method call with an error reply"""
+
+
+def _unit_entry(name, description, load_state, active_state, sub_state):
+    return {
+        'name': name,
+        'load_state': load_state,
+        'active_state': active_state,
+        'sub_state': sub_state,
+        'description': description
+    }
+
+
+class UnitWatcher:
+    """
+    In-memory table of *.service units kept current by a background thread.
+    It subscribes to systemd, loads the table once with ListUnits and then
+    applies UnitNew / UnitRemoved and Unit PropertiesChanged signals, so reads
+    are dict lookups and a state change lands in the table as soon as systemd
+    announces it. A daemon-reload re-lists everything. While disconnected the
+    table is not ready and callers fall back to systemctl; reconnects back off
+    up to MAX_RECONNECT_DELAY.
+    """
+
+    def __init__(self, bus='SYSTEM', on_change=None):
+        self.bus = bus
+        self.on_change = on_change
+        self.error = None
+        self._units = {}
+        self._paths = {}
+        self._signals = None
+        self._ready = False
+        self._lock = native_lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pivitals-systemd', daemon=True)
+        on_main_hub(self._thread.start)
+
+    def stop(self):
+        self._stop.set()
+
+    def units(self):
+        """Copy of the current table as a list of unit dicts"""
+        with self._lock:
+            return [dict(unit) for unit in self._units.values()]
+
+    def _changed(self):
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception:
+                pass
+
+    def _call(self, connection, path, interface, method, signature=None, body=()):
+        address = DBusAddress(path, bus_name=SYSTEMD_BUS_NAME, interface=interface)
+        reply = connection.send_and_get_reply(
+            new_method_call(address, method, signature, body),
+            timeout=CALL_TIMEOUT
+        )
+        if reply.header.message_type == MessageType.error:
+            raise DBusCallError(f'{interface}.{method} failed: {reply.body[0] if reply.body else "error"}')
+        return reply.body
+
+    def _load(self, connection):
+        (listed,) = self._call(connection, SYSTEMD_PATH, MANAGER_INTERFACE, 'ListUnits')
+        units = {}
+        paths = {}
+        for name, description, load_state, active_state, sub_state, _, path, *_ in listed:
+            if name.endswith('.service'):
+                units[name] = _unit_entry(name, description, load_state, active_state, sub_state)
+                paths[path] = name
+        with self._lock:
+            self._units = units
+            self._paths = paths
+        # Signals queued before the ListUnits reply are already reflected in it
+        if self._signals is not None:
+            self._signals.clear()
+
+    def _add(self, connection, name, path):
+        properties = self._call(
+            connection, path, PROPERTIES_INTERFACE, 'GetAll', 's', (UNIT_INTERFACE,)
+        )[0]
+        values = {field: properties.get(key, (None, ''))[1] for key, field in UNIT_PROPERTIES.items()}
+        values['name'] = name
+        with self._lock:
+            self._units[name] = _unit_entry(**values)
+            self._paths[path] = name
+
+    def _handle(self, connection, message):
+        """Apply one signal; returns True if the table changed"""
+        member = message.header.fields.get(HeaderFields.member)
+        path = message.header.fields.get(HeaderFields.path)
+        if member == 'UnitNew':
+            name, unit_path = message.body
+            if name.endswith('.service') and unit_path not in self._paths:
+                try:
+                    self._add(connection, name, unit_path)
+                except DBusCallError:
+                    # A transient unit already gone again, or access denied; the session is fine
+                    return False
+                return True
+        elif member == 'UnitRemoved':
+            name, unit_path = message.body
+            with self._lock:
+                self._paths.pop(unit_path, None)
+                return self._units.pop(name, None) is not None
+        elif member == 'Reloading':
+            (active,) = message.body
+            if not active:
+                self._load(connection)
+                return True
+        elif member == 'PropertiesChanged':
+            interface, changed, _ = message.body
+            if interface != UNIT_INTERFACE:
+                return False
+            with self._lock:
+                name = self._paths.get(path)
+                unit = self._units.get(name) if name else None
+                if unit is None:
+                    return False
+                updated = False
+                for key, field in UNIT_PROPERTIES.items():
+                    if key in changed and key != 'Id':
+                        unit[field] = changed[key][1]
+                        updated = True
+                return updated
+        return False
+
+    def _session(self, connection):
+        rules = [
+            MatchRule(type='signal', sender=SYSTEMD_BUS_NAME, interface=MANAGER_INTERFACE, path=SYSTEMD_PATH),
+            MatchRule(type='signal', sender=SYSTEMD_BUS_NAME, interface=PROPERTIES_INTERFACE,
+                      member='PropertiesChanged', path_namespace=SYSTEMD_PATH + '/unit')
+        ]
+        rules[1].add_arg_condition(0, UNIT_INTERFACE)
+
+        with connection.filter(MatchRule(type='signal'), bufsize=SIGNAL_BUFFER) as signals:
+            self._signals = signals
+            for rule in rules:
+                connection.send_and_get_reply(message_bus.AddMatch(rule), timeout=CALL_TIMEOUT)
+            self._call(connection, SYSTEMD_PATH, MANAGER_INTERFACE, 'Subscribe')
+            self._load(connection)
+            self._ready = True
+            self.error = None
+            self._changed()
+
+            while not self._stop.is_set():
+                try:
+                    message = connection.recv_until_filtered(signals, timeout=RECEIVE_TIMEOUT)
+                except (TimeoutError, socket.timeout):
+                    continue
+                if self._handle(connection, message):
+                    self._changed()
+
+    def _run(self):
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                connection = open_dbus_connection(bus=self.bus)
+            except Exception as e:
+                self.error = f'D-Bus unavailable: {e}'
+            else:
+                try:
+                    delay = 1.0
+                    self._session(connection)
+                except Exception as e:
+                    self.error = f'D-Bus session lost: {e}'
+                finally:
+                    self._ready = False
+                    self._signals = None
+                    connection.close()
+            self._stop.wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+def start_unit_watcher(bus='SYSTEM', on_change=None):
+    """Start a UnitWatcher, or return None if jeepney is not installed"""
+    if open_dbus_connection is None:
+        return None
+    watcher = UnitWatcher(bus=bus, on_change=on_change)
+    watcher.start()
+    return watcher
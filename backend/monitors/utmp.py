@@ -0,0 +1,217 @@
+"""
+utmp / wtmp reader
+Current sessions and login history straight from the glibc login records,
+replacing the who and last commands
+"""
+import os
+import struct
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+
+
+UTMP_PATHS = ['/var/run/utmp', '/run/utmp']
+WTMP_PATH = '/var/log/wtmp'
+
+# struct utmp as written by glibc on Linux (384 bytes on 32- and 64-bit ARM and x86):
+# type, pid, line, id, user, host, exit status, session, tv_sec, tv_usec, addr_v6, unused
+UTMP_RECORD = struct.Struct('=hxxi32s4s32s256shhiii16s20x')
+
+BOOT_TIME = 2
+USER_PROCESS = 7
+DEAD_PROCESS = 8
+
+# Records read per backwards step through wtmp
+READ_BATCH = 256
+
+LoginRecord = namedtuple('LoginRecord', ['type', 'pid', 'line', 'user', 'host', 'timestamp'])
+
+
+def _text(raw):
+    return raw.split(b'\0', 1)[0].decode('utf-8', errors='replace')
+
+
+def _unpack(data, offset=0):
+    (record_type, pid, line, _, user, host, _, _, _, seconds, micros, _) = UTMP_RECORD.unpack_from(data, offset)
+    return LoginRecord(record_type, pid, _text(line), _text(user), _text(host), seconds + micros / 1e6)
+
+
+def _is_logout(record):
+    # Older writers mark a logout as USER_PROCESS with an empty user
+    return record.type == DEAD_PROCESS or (record.type == USER_PROCESS and not record.user)
+
+
+def read_utmp(path):
+    """All records of a utmp-format file, oldest first"""
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    usable = len(data) - len(data) % UTMP_RECORD.size
+    return [_unpack(data, offset) for offset in range(0, usable, UTMP_RECORD.size)]
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).astimezone().isoformat(timespec='seconds')
+
+
+def _format_duration(seconds):
+    """last-style session length: HH:MM, or D+HH:MM past a day"""
+    minutes = max(int(seconds), 0) // 60
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{days}+{hours:02d}:{minutes:02d}' if days else f'{hours:02d}:{minutes:02d}'
+
+
+def _session(record):
+    return {
+        'user': record.user,
+        'tty': record.line,
+        'host': record.host or None,
+        'login': record.timestamp,
+        'logout': None,
+        'ended_by': None
+    }
+
+
+def _session_entry(session):
+    login = session['login']
+    logout = session['logout']
+    return {
+        'user': session['user'],
+        'tty': session['tty'],
+        'host': session['host'],
+        'login': _format_time(login),
+        'logout': _format_time(logout) if logout is not None else None,
+        'duration': _format_duration(logout - login) if logout is not None else None,
+        'still_logged_in': logout is None,
+        'ended_by': session['ended_by'],
+        'login_timestamp': login,
+        'logout_timestamp': logout
+    }
+
+
+class WtmpReader:
+    """
+    Most recent login sessions from wtmp, the way last pairs them up.
+    The first read walks the file backwards from the end in READ_BATCH-record
+    steps and stops once `capacity` sessions are known, so it does not depend on
+    the file's size. Afterwards only records appended past the remembered offset
+    are read: a login opens a session, a logout on the same tty closes it, and a
+    boot record closes every session still open. A rotated or truncated wtmp
+    (new inode or smaller size) is read again from the end.
+    """
+
+    def __init__(self, path=WTMP_PATH, capacity=100):
+        self.path = path
+        self.capacity = capacity
+        self._sessions = deque(maxlen=capacity)
+        self._open = {}
+        self._inode = None
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def _load_backwards(self, handle, size):
+        self._sessions.clear()
+        self._open = {}
+        logouts = {}
+        boot = None
+        end = size - size % UTMP_RECORD.size
+        position = end
+
+        while position > 0 and len(self._sessions) < self.capacity:
+            start = max(position - READ_BATCH * UTMP_RECORD.size, 0)
+            handle.seek(start)
+            data = handle.read(position - start)
+            for offset in range(len(data) - UTMP_RECORD.size, -1, -UTMP_RECORD.size):
+                record = _unpack(data, offset)
+                if _is_logout(record):
+                    logouts[record.line] = record.timestamp
+                elif record.type == USER_PROCESS:
+                    session = _session(record)
+                    logout = logouts.pop(record.line, None)
+                    if logout is not None:
+                        session['logout'] = logout
+                        session['ended_by'] = 'logout'
+                    elif boot is not None:
+                        session['logout'] = boot
+                        session['ended_by'] = 'reboot'
+                    elif record.line not in self._open:
+                        self._open[record.line] = session
+                    self._sessions.append(session)
+                    if len(self._sessions) >= self.capacity:
+                        break
+                elif record.type == BOOT_TIME:
+                    # Anything older was ended by this boot, whatever its logout says
+                    boot = record.timestamp
+                    logouts.clear()
+            position = start
+        self._offset = end
+
+    def _apply(self, record):
+        if _is_logout(record):
+            session = self._open.pop(record.line, None)
+            if session is not None:
+                session['logout'] = record.timestamp
+                session['ended_by'] = 'logout'
+        elif record.type == USER_PROCESS:
+            session = _session(record)
+            self._sessions.appendleft(session)
+            self._open[record.line] = session
+        elif record.type == BOOT_TIME:
+            for session in self._open.values():
+                session['logout'] = record.timestamp
+                session['ended_by'] = 'reboot'
+            self._open = {}
+
+    def _read_forward(self, handle, size):
+        end = size - size % UTMP_RECORD.size
+        if end <= self._offset:
+            return
+        handle.seek(self._offset)
+        data = handle.read(end - self._offset)
+        for offset in range(0, len(data) - UTMP_RECORD.size + 1, UTMP_RECORD.size):
+            self._apply(_unpack(data, offset))
+        self._offset = end
+
+    def recent(self, limit=10):
+        """Newest-first session entries; raises OSError if wtmp cannot be read"""
+        with self._lock:
+            with open(self.path, 'rb') as handle:
+                stat = os.fstat(handle.fileno())
+                if stat.st_ino != self._inode or stat.st_size < self._offset:
+                    self._inode = stat.st_ino
+                    self._load_backwards(handle, stat.st_size)
+                else:
+                    self._read_forward(handle, stat.st_size)
+            return [_session_entry(session) for session in list(self._sessions)[:limit]]
+
+
+class UtmpSessions:
+    """Logged-in users from utmp, re-read only when the file changes"""
+
+    def __init__(self, paths=UTMP_PATHS):
+        self.paths = paths
+        self._signature = None
+        self._sessions = []
+
+    def sessions(self):
+        """Current USER_PROCESS entries; raises FileNotFoundError if no utmp exists"""
+        path = next((path for path in self.paths if os.path.exists(path)), None)
+        if path is None:
+            raise FileNotFoundError('utmp not found')
+        stat = os.stat(path)
+        signature = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature != self._signature:
+            self._sessions = [
+                {
+                    'user': record.user,
+                    'tty': record.line,
+                    'login_time': time.strftime('%Y-%m-%d %H:%M', time.localtime(record.timestamp)),
+                    'host': record.host or None,
+                    'timestamp': record.timestamp
+                }
+                for record in read_utmp(path)
+                if record.type == USER_PROCESS and record.user
+            ]
+            self._signature = signature
+        return [dict(session) for session in self._sessions]
@@ -3,5 +3,6 @@ API route handlers
 """
 from .metrics import metrics_bp
 from .system import system_bp
+from .exposition import exposition_bp
 
-__all__ = ['metrics_bp', 'system_bp']
+__all__ = ['metrics_bp', 'system_bp', 'exposition_bp']
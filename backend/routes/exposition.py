@@ -0,0 +1,21 @@
+"""
+Prometheus scrape endpoint
+Serves the sampler snapshot in the OpenMetrics text format
+"""
+from flask import Blueprint, Response, current_app
+from engine import OPENMETRICS_CONTENT_TYPE
+from .metrics import get_latest_snapshot
+
+exposition_bp = Blueprint('exposition', __name__)
+
+
+@exposition_bp.route('/metrics', methods=['GET'])
+def openmetrics():
+    """OpenMetrics exposition of the latest snapshot, rendered once per tick"""
+    snapshot = get_latest_snapshot()
+    if snapshot is None:
+        return Response('# Metrics not yet available\n', status=503, mimetype='text/plain')
+    return Response(
+        current_app.extensions['openmetrics'].body(snapshot),
+        content_type=OPENMETRICS_CONTENT_TYPE
+    )
@@ -2,101 +2,160 @@
 Metrics API endpoints
 Provides REST API for system metrics
 """
-from flask import Blueprint, jsonify
-from functools import lru_cache
 import time
-from monitors import (
-    get_cpu_metrics,
-    get_memory_metrics,
-    get_disk_metrics,
-    get_network_metrics
-)
+from flask import Blueprint, Response, jsonify, current_app, request
+from engine import parse_fields, snapshot_etag, snapshot_fields
 
 metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/v1/metrics')
 
-# Cache timestamp for cache invalidation
-_cache_timestamp = {'time': 0}
 
+def get_latest_snapshot():
+    """Latest sampler snapshot; only waits if the first tick has not finished yet"""
+    sampler = current_app.extensions['sampler']
+    return sampler.latest(timeout=current_app.config.get('SAMPLER_STARTUP_TIMEOUT', 5))
 
-def should_update_cache():
-    """Check if cache should be updated (1 second interval)"""
-    current_time = time.time()
-    if current_time - _cache_timestamp['time'] >= 1:
-        _cache_timestamp['time'] = current_time
-        # Clear LRU cache to force new data fetch
-        get_cpu_metrics_cached.cache_clear()
-        get_memory_metrics_cached.cache_clear()
-        get_disk_metrics_cached.cache_clear()
-        get_network_metrics_cached.cache_clear()
-        return True
-    return False
 
+def _unavailable():
+    return jsonify({'error': 'Metrics not yet available'}), 503
 
-@lru_cache(maxsize=1)
-def get_cpu_metrics_cached():
-    """Cached CPU metrics"""
-    return get_cpu_metrics()
 
+def snapshot_response(view, snapshot):
+    """
+    One view of a snapshot from the shared response cache, limited to the
+    fields= paths if given and tagged with the snapshot's ETag. A matching
+    If-None-Match gets a 304 without any encoding.
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    current_app.extensions['demand'].request(snapshot_fields(view, fields))
 
-@lru_cache(maxsize=1)
-def get_memory_metrics_cached():
-    """Cached memory metrics"""
-    return get_memory_metrics()
+    etag = snapshot_etag(snapshot)
+    headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        body, compressed = current_app.extensions['responses'].body(
+            snapshot, view, compressed=request.accept_encodings['gzip'] > 0, fields=fields
+        )
+        response = Response(body, mimetype='application/json', headers=headers)
+        if compressed:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag, weak=True)
+    return response
 
 
-@lru_cache(maxsize=1)
-def get_disk_metrics_cached():
-    """Cached disk metrics"""
-    return get_disk_metrics()
-
-
-@lru_cache(maxsize=1)
-def get_network_metrics_cached():
-    """Cached network metrics"""
-    return get_network_metrics()
+def _snapshot_section(name):
+    snapshot = get_latest_snapshot()
+    if snapshot is None:
+        return _unavailable()
+    return snapshot_response(name, snapshot)
 
 
 @metrics_bp.route('/cpu', methods=['GET'])
 def cpu_metrics():
     """Get CPU metrics"""
-    should_update_cache()
-    data = get_cpu_metrics_cached()
-    return jsonify(data), 200
+    return _snapshot_section('cpu')
 
 
 @metrics_bp.route('/memory', methods=['GET'])
 def memory_metrics():
     """Get memory metrics"""
-    should_update_cache()
-    data = get_memory_metrics_cached()
-    return jsonify(data), 200
+    return _snapshot_section('memory')
 
 
 @metrics_bp.route('/disk', methods=['GET'])
 def disk_metrics():
     """Get disk metrics"""
-    should_update_cache()
-    data = get_disk_metrics_cached()
-    return jsonify(data), 200
+    return _snapshot_section('disk')
 
 
 @metrics_bp.route('/network', methods=['GET'])
 def network_metrics():
     """Get network metrics"""
-    should_update_cache()
-    data = get_network_metrics_cached()
-    return jsonify(data), 200
+    return _snapshot_section('network')
 
 
 @metrics_bp.route('/all', methods=['GET'])
 def all_metrics():
-    """Get all metrics in a single call"""
-    should_update_cache()
+    """
+    Get all metrics in a single call.
+    With ?since=<seq>, returns only the fields changed since that snapshot
+    ({'seq', 'base', 'patch'}), or a full payload when a keyframe is due.
+    """
+    snapshot = get_latest_snapshot()
+    if snapshot is None:
+        return _unavailable()
+
+    since = request.args.get('since', type=int)
+    if 'since' in request.args:
+        current_app.extensions['demand'].request()
+        message = current_app.extensions['stream'].delta.encode(since)
+        if message is not None:
+            return Response(message[2], mimetype='application/json'), 200
+
+    return snapshot_response('all', snapshot)
+
+
+def _demanding(chunks, demand):
+    """Keep every lazy collector wanted while a stream client is connected"""
+    for chunk in chunks:
+        demand.request()
+        yield chunk
+
+
+@metrics_bp.route('/stream', methods=['GET'])
+def metrics_stream():
+    """Stream every new snapshot as a Server-Sent Event"""
+    broadcaster = current_app.extensions['stream']
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    min_interval = max(0.0, request.args.get('interval', 0.0, type=float))
+    delta = request.args.get('delta', '').lower() in ('1', 'true')
+
+    return Response(
+        _demanding(
+            broadcaster.subscribe(last_event_id=last_event_id, min_interval=min_interval, delta=delta),
+            current_app.extensions['demand']
+        ),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@metrics_bp.route('/history', methods=['GET'])
+def metrics_history():
+    """
+    Get stored history for one metric over a time range.
+    Samples are written to disk in pages; the sampling worker includes the ones
+    still buffered, other workers can trail the live snapshot by up to
+    HISTORY_FLUSH_SECONDS.
+    """
+    history = current_app.extensions.get('history')
+    if history is None:
+        return jsonify({'error': 'Metric history is disabled'}), 404
+
+    metric = request.args.get('metric', 'cpu.usage_percent')
+    end = request.args.get('to', type=float) or time.time()
+    start = request.args.get('from', type=float) or end - 3600
+    points = request.args.get('points', 500, type=int)
+
+    try:
+        resolution, rows = history.query(metric, start, end, points=max(1, min(points, 5000)))
+    except KeyError:
+        return jsonify({
+            'error': f'Unknown metric: {metric}',
+            'available': history.names
+        }), 400
 
     return jsonify({
-        'cpu': get_cpu_metrics_cached(),
-        'memory': get_memory_metrics_cached(),
-        'disk': get_disk_metrics_cached(),
-        'network': get_network_metrics_cached(),
-        'timestamp': time.time()
+        'metric': metric,
+        'from': start,
+        'to': end,
+        'resolution': resolution,
+        'columns': ['timestamp', 'avg', 'min', 'max', 'count'],
+        'points': rows
     }), 200
@@ -1,87 +1,80 @@
 """
 System API endpoints for processes, services, and security info
 """
-from flask import Blueprint, jsonify, current_app
-from functools import lru_cache
-import time
-from monitors import (
-    get_process_metrics,
-    get_service_metrics,
-    get_security_metrics
-)
+from flask import Blueprint, current_app, jsonify, request
+from engine import PROCESS_SORT_KEYS
+from .metrics import get_latest_snapshot, snapshot_response
 
 system_bp = Blueprint('system', __name__, url_prefix='/api/v1/system')
 
-_system_cache_timestamp = {'time': 0}
+PROCESS_QUERY_ARGS = ('sort', 'user', 'name', 'limit', 'offset')
+PROCESS_QUERY_MAX_LIMIT = 500
 
 
-def _should_update_cache():
-    ttl = current_app.config.get('SYSTEM_CACHE_SECONDS', 5)
-    current_time = time.time()
-    if current_time - _system_cache_timestamp['time'] >= ttl:
-        _system_cache_timestamp['time'] = current_time
-        get_process_metrics_cached.cache_clear()
-        get_service_metrics_cached.cache_clear()
-        get_security_metrics_cached.cache_clear()
-        get_system_overview_cached.cache_clear()
-        return True
-    return False
+def _unavailable():
+    return jsonify({'error': 'System info not yet available'}), 503
 
 
-@lru_cache(maxsize=1)
-def get_process_metrics_cached():
-    limit = current_app.config.get('SYSTEM_PROCESS_LIMIT', 10)
-    return get_process_metrics(limit=limit)
-
-
-@lru_cache(maxsize=1)
-def get_service_metrics_cached():
-    limit = current_app.config.get('SYSTEM_SERVICE_LIMIT', 15)
-    watched = current_app.config.get('WATCHED_SERVICES', [])
-    return get_service_metrics(limit=limit, watched=watched)
-
-
-@lru_cache(maxsize=1)
-def get_security_metrics_cached():
-    login_limit = current_app.config.get('SYSTEM_SECURITY_LIMIT', 10)
-    failed_limit = current_app.config.get('SYSTEM_SECURITY_LIMIT', 10)
-    sudo_limit = current_app.config.get('SYSTEM_SECURITY_LIMIT', 10)
-    return get_security_metrics(
-        login_limit=login_limit,
-        failed_limit=failed_limit,
-        sudo_limit=sudo_limit
-    )
-
-
-@lru_cache(maxsize=1)
-def get_system_overview_cached():
-    return {
-        'processes': get_process_metrics_cached(),
-        'services': get_service_metrics_cached(),
-        'security': get_security_metrics_cached(),
-        'timestamp': time.time()
-    }
+def _snapshot_section(name):
+    snapshot = get_latest_snapshot()
+    if snapshot is None:
+        return _unavailable()
+    return snapshot_response(name, snapshot)
 
 
 @system_bp.route('/processes', methods=['GET'])
 def process_metrics():
-    _should_update_cache()
-    return jsonify(get_process_metrics_cached()), 200
+    """
+    Without query parameters, the summary and top-N lists from the snapshot.
+    With sort/user/name/limit/offset, one page of the full process table.
+    """
+    if not any(arg in request.args for arg in PROCESS_QUERY_ARGS):
+        return _snapshot_section('processes')
+
+    snapshot = get_latest_snapshot()
+    index = current_app.extensions['processes'].index()
+    if snapshot is None or index is None:
+        return _unavailable()
+
+    sort = request.args.get('sort', 'cpu')
+    if sort not in PROCESS_SORT_KEYS:
+        return jsonify({
+            'error': f'Unknown sort: {sort}',
+            'available': sorted(PROCESS_SORT_KEYS)
+        }), 400
+    user = request.args.get('user') or None
+    name = request.args.get('name') or None
+    limit = max(1, min(request.args.get('limit', current_app.config['SYSTEM_PROCESS_LIMIT'], type=int),
+                       PROCESS_QUERY_MAX_LIMIT))
+    offset = max(0, request.args.get('offset', 0, type=int))
+
+    total, processes = index.query(sort=sort, user=user, name=name, limit=limit, offset=offset)
+    return jsonify({
+        'summary': snapshot.metrics['processes'].get('summary', {}),
+        'sort': sort,
+        'user': user,
+        'name': name,
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'processes': processes,
+        'timestamp': index.timestamp
+    }), 200
 
 
 @system_bp.route('/services', methods=['GET'])
 def service_metrics():
-    _should_update_cache()
-    return jsonify(get_service_metrics_cached()), 200
+    return _snapshot_section('services')
 
 
 @system_bp.route('/security', methods=['GET'])
 def security_metrics():
-    _should_update_cache()
-    return jsonify(get_security_metrics_cached()), 200
+    return _snapshot_section('security')
 
 
 @system_bp.route('/overview', methods=['GET'])
 def system_overview():
-    _should_update_cache()
-    return jsonify(get_system_overview_cached()), 200
+    snapshot = get_latest_snapshot()
+    if snapshot is None:
+        return _unavailable()
+    return snapshot_response('overview', snapshot)
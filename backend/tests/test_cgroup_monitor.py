@@ -0,0 +1,97 @@
+from monitors import cgroup_monitor
+from monitors.cgroup_monitor import CgroupAccounting
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _write_unit(root, name, cpu_usec, memory, read_bytes, write_bytes):
+    unit = root / 'system.slice' / name
+    unit.mkdir(parents=True, exist_ok=True)
+    (unit / 'cpu.stat').write_text(f'usage_usec {cpu_usec}\nuser_usec 0\nsystem_usec 0\n')
+    (unit / 'memory.current').write_text(f'{memory}\n')
+    (unit / 'io.stat').write_text(
+        f'179:0 rbytes={read_bytes} wbytes={write_bytes} rios=1 wios=1 dbytes=0 dios=0\n'
+        f'8:0 rbytes=0 wbytes={write_bytes} rios=0 wios=1 dbytes=0 dios=0\n'
+    )
+    return unit
+
+
+def _remove_unit(unit):
+    for child in unit.iterdir():
+        child.unlink()
+    unit.rmdir()
+
+
+def test_rates_between_two_samples(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cgroup_monitor.time, 'monotonic', clock)
+    _write_unit(tmp_path, 'nginx.service', 1_000_000, 4096, 0, 0)
+    (tmp_path / 'system.slice' / 'user.slice').mkdir()
+    accounting = CgroupAccounting(str(tmp_path))
+
+    first = accounting.sample()
+    assert first == {'nginx.service': {
+        'cpu_percent': None,
+        'memory_bytes': 4096,
+        'io_read_bytes_per_sec': None,
+        'io_write_bytes_per_sec': None
+    }}
+
+    clock.now += 2.0
+    _write_unit(tmp_path, 'nginx.service', 2_000_000, 8192, 4000, 1000)
+    second = accounting.sample()
+    assert second['nginx.service'] == {
+        'cpu_percent': 50.0,
+        'memory_bytes': 8192,
+        'io_read_bytes_per_sec': 2000.0,
+        'io_write_bytes_per_sec': 1000.0
+    }
+
+
+def test_samples_inside_min_window_keep_the_baseline(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cgroup_monitor.time, 'monotonic', clock)
+    _write_unit(tmp_path, 'nginx.service', 0, 4096, 0, 0)
+    accounting = CgroupAccounting(str(tmp_path), min_window=1.0)
+    accounting.sample()
+
+    clock.now += 1.0
+    _write_unit(tmp_path, 'nginx.service', 500_000, 4096, 0, 0)
+    assert accounting.sample()['nginx.service']['cpu_percent'] == 50.0
+
+    # An extra tick 0.1 s later repeats the rates but reports current memory
+    clock.now += 0.1
+    _write_unit(tmp_path, 'nginx.service', 600_000, 16384, 0, 0)
+    usage = accounting.sample()['nginx.service']
+    assert usage['cpu_percent'] == 50.0
+    assert usage['memory_bytes'] == 16384
+
+    # The next full window is measured from the last baseline, not the extra tick
+    clock.now += 0.9
+    _write_unit(tmp_path, 'nginx.service', 1_000_000, 16384, 0, 0)
+    assert accounting.sample()['nginx.service']['cpu_percent'] == 50.0
+
+
+def test_unit_that_disappears_is_dropped_and_restarts_without_rates(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cgroup_monitor.time, 'monotonic', clock)
+    nginx = _write_unit(tmp_path, 'nginx.service', 1_000_000, 4096, 0, 0)
+    _write_unit(tmp_path, 'sshd.service', 1_000_000, 4096, 0, 0)
+    accounting = CgroupAccounting(str(tmp_path))
+    accounting.sample()
+
+    clock.now += 1.0
+    _remove_unit(nginx)
+    assert list(accounting.sample()) == ['sshd.service']
+
+    clock.now += 1.0
+    _write_unit(tmp_path, 'nginx.service', 10_000, 4096, 0, 0)
+    usage = accounting.sample()
+    assert usage['nginx.service']['cpu_percent'] is None
+    assert usage['sshd.service']['cpu_percent'] == 0.0
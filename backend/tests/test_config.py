@@ -0,0 +1,10 @@
+from config import parse_collector_ttls
+
+
+def test_collector_ttls_skip_bad_entries(capsys):
+    ttls = parse_collector_ttls('cpu:1, memory:2.5,cpu=2,disk:,net:abc,:3,gpu:0,temp:-1,io:nan,')
+
+    assert ttls == {'cpu': 1.0, 'memory': 2.5}
+    warnings = capsys.readouterr().out.splitlines()
+    assert len(warnings) == 7
+    assert all(line.startswith('Warning:') for line in warnings)
@@ -0,0 +1,40 @@
+import threading
+from collections import namedtuple
+
+from monitors import disk_monitor
+from monitors.disk_monitor import MountUsage
+
+
+Partition = namedtuple('Partition', ['device', 'mountpoint', 'fstype'])
+Usage = namedtuple('Usage', ['total', 'used', 'free', 'percent'])
+
+HUNG = ['/mnt/nfs1', '/mnt/nfs2', '/mnt/nfs3']
+
+
+def test_hung_mounts_do_not_hold_up_healthy_ones(monkeypatch):
+    release = threading.Event()
+
+    def disk_usage(mountpoint):
+        if mountpoint in HUNG:
+            release.wait(30)
+        return Usage(100, 40, 60, 40.0)
+
+    monkeypatch.setattr(disk_monitor.psutil, 'disk_usage', disk_usage)
+    usage = MountUsage(timeout=0.2, workers=2)
+    mounts = [Partition('server:/export', mountpoint, 'nfs4') for mountpoint in HUNG]
+    mounts.append(Partition('/dev/mmcblk0p2', '/', 'ext4'))
+    monkeypatch.setattr(usage._mount_table, 'mounts', lambda: mounts)
+
+    try:
+        for _ in range(4):
+            partitions = {partition['mountpoint']: partition for partition in usage.collect()}
+            root = partitions['/']
+            assert root['percent'] == 40.0
+            assert not root['stale']
+            assert 'error' not in root
+
+        for mountpoint in HUNG:
+            assert partitions[mountpoint]['stale']
+            assert partitions[mountpoint]['error'] == 'statvfs timed out after 0.2s'
+    finally:
+        release.set()
@@ -0,0 +1,87 @@
+import time
+
+from engine.history import HistoryStore
+from engine.sampler import Snapshot
+
+
+def _store(path):
+    return HistoryStore(str(path), retention_seconds=3600, interval=1, rollups=[(10, 3600)])
+
+
+def _append(store, timestamp, usage):
+    store.append(Snapshot(0, timestamp, {'cpu': {'usage_percent': usage}}))
+
+
+def test_restart_across_bucket_boundary_keeps_open_bucket(tmp_path):
+    path = tmp_path / 'history.bin'
+    store = _store(path)
+    for offset, usage in enumerate([10.0, 20.0, 30.0]):
+        _append(store, 1000.0 + offset, usage)
+    store.close()
+
+    # Down for longer than a bucket: 1000-1010 was still open when the store closed
+    store = _store(path)
+    _append(store, 1025.0, 50.0)
+    _append(store, 1031.0, 60.0)
+    store.flush()
+
+    resolution, rows = store.query('cpu.usage_percent', 1000, 1030, points=3)
+    store.close()
+
+    assert resolution == 10
+    assert rows == [[1000.0, 20.0, 10.0, 30.0, 3], [1020.0, 50.0, 50.0, 50.0, 1]]
+
+
+def test_old_narrow_query_reads_a_rollup_that_still_covers_it(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.bin'), retention_seconds=60, interval=1, rollups=[(10, 86400)])
+    start = int(time.time()) - 7200
+    start -= start % 10
+    for offset in range(30):
+        _append(store, start + offset, float(offset))
+    # Enough recent samples to overwrite the raw ring (64 records) entirely
+    recent = int(time.time()) - 100
+    for offset in range(100):
+        _append(store, recent + offset, 1.0)
+    store.flush()
+
+    resolution, rows = store.query('cpu.usage_percent', start, start + 29, points=500)
+    store.close()
+
+    assert resolution == 10
+    assert [row[0] for row in rows] == [start, start + 10, start + 20]
+    assert [row[4] for row in rows] == [10, 10, 10]
+
+
+def test_writer_serves_samples_it_has_not_flushed(tmp_path):
+    store = _store(tmp_path / 'history.bin')
+    now = int(time.time())
+    for offset in range(5):
+        _append(store, now - 5 + offset, 10.0)
+
+    _, rows = store.query('cpu.usage_percent', now - 60, now)
+    store.close()
+
+    assert [row[0] for row in rows] == [now - 5, now - 4, now - 3, now - 2, now - 1]
+
+
+def test_only_the_writer_moves_a_file_with_another_layout_aside(tmp_path):
+    path = tmp_path / 'history.bin'
+    now = int(time.time())
+    old = HistoryStore(str(path), retention_seconds=3600, interval=1, rollups=[])
+    _append(old, now - 10, 10.0)
+    old.close()
+
+    # Retention changed: a reader leaves the old file alone and sees nothing yet
+    reader = HistoryStore(str(path), retention_seconds=7200, interval=1, rollups=[])
+    assert reader.query('cpu.usage_percent', now - 60, now)[1] == []
+    assert not (tmp_path / 'history.bin.old').exists()
+
+    writer = HistoryStore(str(path), retention_seconds=7200, interval=1, rollups=[])
+    _append(writer, now - 1, 20.0)
+    writer.flush()
+    assert (tmp_path / 'history.bin.old').exists()
+
+    _, rows = reader.query('cpu.usage_percent', now - 60, now)
+    reader.close()
+    writer.close()
+    assert rows == [[now - 1, 20.0, 20.0, 20.0, 1]]
@@ -0,0 +1,61 @@
+import json
+import time
+
+from monitors.security_monitor import JournalSource
+
+
+ENTRY = {
+    '__CURSOR': 's=1;i=1',
+    '__REALTIME_TIMESTAMP': '1700000000000000',
+    '_HOSTNAME': 'pi',
+    'SYSLOG_IDENTIFIER': 'sshd',
+    '_PID': '42',
+    'MESSAGE': 'Failed password for root from 10.0.0.5 port 22 ssh2'
+}
+
+
+def _fake_journalctl(tmp_path, body):
+    script = tmp_path / 'journalctl'
+    script.write_text('#!/bin/sh\n' + body)
+    script.chmod(0o755)
+    return str(script)
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_follower_hint_on_stderr_is_not_an_error(tmp_path):
+    journalctl = _fake_journalctl(tmp_path, (
+        'echo "Hint: You are currently not seeing messages from other users." >&2\n'
+        f"echo '{json.dumps(ENTRY)}'\n"
+        'exec sleep 30\n'
+    ))
+    source = JournalSource(journalctl=journalctl)
+    lines = []
+    try:
+        assert source.poll(lines.extend) is None
+        _wait_for(lambda: lines)
+        assert source.poll(lines.extend) is None
+    finally:
+        source.stop()
+
+    assert len(lines) == 1
+    assert lines[0].endswith('sshd[42]: Failed password for root from 10.0.0.5 port 22 ssh2')
+    assert source.cursor == 's=1;i=1'
+
+
+def test_follower_reports_stderr_when_journalctl_exits(tmp_path):
+    journalctl = _fake_journalctl(tmp_path, (
+        'echo "Failed to open journal: Permission denied" >&2\n'
+        'exit 1\n'
+    ))
+    source = JournalSource(journalctl=journalctl)
+    try:
+        source.poll(lambda lines: None)
+        _wait_for(lambda: source.error)
+        assert source.poll(lambda lines: None) == 'Failed to open journal: Permission denied'
+    finally:
+        source.stop()
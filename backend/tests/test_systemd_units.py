@@ -0,0 +1,95 @@
+from jeepney import DBusAddress, HeaderFields, new_error, new_method_return, new_signal
+
+from monitors.systemd_units import (
+    MANAGER_INTERFACE,
+    PROPERTIES_INTERFACE,
+    SYSTEMD_PATH,
+    UNIT_INTERFACE,
+    UnitWatcher
+)
+
+
+NGINX_PATH = '/org/freedesktop/systemd1/unit/nginx_2eservice'
+RUN_PATH = '/org/freedesktop/systemd1/unit/run_2du1_2eservice'
+
+
+class FakeSystemd:
+    """Stands in for a bus connection, answering method calls like systemd would"""
+
+    def __init__(self, units):
+        self.units = units
+        self.calls = []
+
+    def send_and_get_reply(self, message, timeout=None):
+        member = message.header.fields[HeaderFields.member]
+        path = message.header.fields[HeaderFields.path]
+        self.calls.append(member)
+        if member == 'ListUnits':
+            listed = [
+                (name, description, 'loaded', active, sub, '', unit_path, 0, '', '/')
+                for unit_path, (name, description, active, sub) in self.units.items()
+            ]
+            return new_method_return(message, 'a(ssssssouso)', (listed,))
+        if member == 'GetAll':
+            if path not in self.units:
+                return new_error(message, 'org.freedesktop.DBus.Error.UnknownObject', 's', (f'Unknown object {path}',))
+            name, description, active, sub = self.units[path]
+            properties = {
+                'Id': ('s', name),
+                'Description': ('s', description),
+                'LoadState': ('s', 'loaded'),
+                'ActiveState': ('s', active),
+                'SubState': ('s', sub)
+            }
+            return new_method_return(message, 'a{sv}', (properties,))
+        raise AssertionError(f'unexpected call {member}')
+
+
+def _manager_signal(member, signature, body):
+    return new_signal(DBusAddress(SYSTEMD_PATH, interface=MANAGER_INTERFACE), member, signature, body)
+
+
+def _properties_changed(path, changed):
+    return new_signal(
+        DBusAddress(path, interface=PROPERTIES_INTERFACE), 'PropertiesChanged', 'sa{sv}as',
+        (UNIT_INTERFACE, changed, [])
+    )
+
+
+def _table(watcher):
+    return {unit['name']: unit for unit in watcher.units()}
+
+
+def test_signals_keep_the_unit_table_current():
+    systemd = FakeSystemd({NGINX_PATH: ('nginx.service', 'nginx', 'active', 'running')})
+    watcher = UnitWatcher()
+    watcher._load(systemd)
+    assert _table(watcher)['nginx.service']['active_state'] == 'active'
+
+    systemd.units[RUN_PATH] = ('run-u1.service', 'transient', 'activating', 'start')
+    assert watcher._handle(systemd, _manager_signal('UnitNew', 'so', ('run-u1.service', RUN_PATH)))
+    assert _table(watcher)['run-u1.service']['sub_state'] == 'start'
+
+    changed = {'ActiveState': ('s', 'failed'), 'SubState': ('s', 'failed')}
+    assert watcher._handle(systemd, _properties_changed(NGINX_PATH, changed))
+    assert _table(watcher)['nginx.service']['active_state'] == 'failed'
+
+    assert watcher._handle(systemd, _manager_signal('UnitRemoved', 'so', ('run-u1.service', RUN_PATH)))
+    assert 'run-u1.service' not in _table(watcher)
+
+    # A daemon-reload re-lists everything once it has finished
+    systemd.units[NGINX_PATH] = ('nginx.service', 'nginx', 'active', 'running')
+    assert not watcher._handle(systemd, _manager_signal('Reloading', 'b', (True,)))
+    assert watcher._handle(systemd, _manager_signal('Reloading', 'b', (False,)))
+    assert _table(watcher)['nginx.service']['active_state'] == 'active'
+
+
+def test_unit_gone_before_getall_is_skipped():
+    systemd = FakeSystemd({NGINX_PATH: ('nginx.service', 'nginx', 'active', 'running')})
+    watcher = UnitWatcher()
+    watcher._load(systemd)
+
+    # The transient unit has already been garbage-collected when UnitNew is handled
+    assert not watcher._handle(systemd, _manager_signal('UnitNew', 'so', ('run-u2.service', RUN_PATH)))
+    assert sorted(_table(watcher)) == ['nginx.service']
+    assert systemd.calls[-1] == 'GetAll'
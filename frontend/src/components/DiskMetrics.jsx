@@ -44,9 +44,15 @@ const DiskMetrics = ({ data, history }) => {
             <div key={index} style={{ marginBottom: '15px', paddingBottom: '15px', borderBottom: index < data.partitions.length - 1 ? '1px solid #f0f0f0' : 'none' }}>
               <div className="metric-row">
                 <span className="metric-row-label" style={{ fontWeight: 600 }}>{partition.mountpoint}</span>
-                <span className={`status-indicator ${getUsageStatus(partition.percent)}`}>
-                  {partition.percent}%
-                </span>
+                {partition.stale ? (
+                  <span className="status-indicator status-warning" title={partition.error}>
+                    {partition.percent === null ? 'Not responding' : `${partition.percent}% (stale)`}
+                  </span>
+                ) : (
+                  <span className={`status-indicator ${getUsageStatus(partition.percent)}`}>
+                    {partition.percent}%
+                  </span>
+                )}
               </div>
 
               <div className="metric-row" style={{ fontSize: '0.85rem' }}>
@@ -136,6 +142,33 @@ const DiskMetrics = ({ data, history }) => {
           )}
         </div>
       )}
+
+      {data.devices && Object.keys(data.devices).length > 0 && (
+        <div style={{ marginTop: '20px', paddingTop: '15px', borderTop: '2px solid #f0f0f0' }}>
+          <h3 style={{ fontSize: '1.1rem', marginBottom: '10px', color: '#666' }}>Devices</h3>
+
+          {Object.entries(data.devices).map(([name, device]) => (
+            <div key={name} style={{ marginBottom: '10px' }}>
+              <div className="metric-row">
+                <span className="metric-row-label">{name}</span>
+                <span className="metric-row-value">
+                  {device.util_percent === null ? 'n/a' : `${device.util_percent}% util`}
+                </span>
+              </div>
+              {device.util_percent !== null && (
+                <div className="metric-row" style={{ fontSize: '0.85rem' }}>
+                  <span className="metric-row-label">
+                    {device.read_iops}/{device.write_iops} IOPS · await {device.await_ms} ms · queue {device.queue_depth}
+                  </span>
+                  <span className="metric-row-value">
+                    ↓ {formatBytes(device.read_bytes_per_sec)}/s / ↑ {formatBytes(device.write_bytes_per_sec)}/s
+                  </span>
+                </div>
+              )}
+            </div>
+          ))}
+        </div>
+      )}
     </div>
   );
 };
@@ -7,48 +7,19 @@ const NetworkMetrics = ({ data, history }) => {
   const formatBytes = (bytes) => {
     if (!bytes) return '0 B';
     const sizes = ['B', 'KB', 'MB', 'GB', 'TB'];
-    const i = Math.floor(Math.log(bytes) / Math.log(1024));
+    const i = Math.max(0, Math.floor(Math.log(bytes) / Math.log(1024)));
     return `${(bytes / Math.pow(1024, i)).toFixed(2)} ${sizes[i]}`;
   };
 
-  // Calculate bandwidth changes from history
-  const calculateBandwidth = () => {
-    if (history.length < 2) return null;
-
-    const recent = history.slice(-2);
-    const timeDiff = (recent[1].timestamp - recent[0].timestamp) / 1000; // seconds
-
-    const interfaces = Object.keys(data.interfaces);
-    const bandwidthData = {};
-
-    interfaces.forEach(iface => {
-      const oldStats = recent[0].network?.interfaces?.[iface];
-      const newStats = recent[1].network?.interfaces?.[iface];
-
-      if (oldStats && newStats) {
-        const sentDiff = newStats.bytes_sent - oldStats.bytes_sent;
-        const recvDiff = newStats.bytes_recv - oldStats.bytes_recv;
-
-        bandwidthData[iface] = {
-          sent: sentDiff / timeDiff,  // bytes per second
-          recv: recvDiff / timeDiff,
-        };
-      }
-    });
-
-    return bandwidthData;
-  };
-
-  const bandwidth = calculateBandwidth();
-
   // Prepare chart data for bandwidth history
   const chartData = history.slice(-30).map((item, index) => {
     const dataPoint = { name: index };
 
     Object.keys(data.interfaces).forEach(iface => {
       if (item.network?.interfaces?.[iface]) {
-        dataPoint[`${iface}_sent`] = item.network.interfaces[iface].bytes_sent;
-        dataPoint[`${iface}_recv`] = item.network.interfaces[iface].bytes_recv;
+        const rates = item.network.interfaces[iface].rates || {};
+        dataPoint[`${iface}_sent`] = rates.bytes_sent_per_sec;
+        dataPoint[`${iface}_recv`] = rates.bytes_recv_per_sec;
       }
     });
 
@@ -132,9 +103,9 @@ const NetworkMetrics = ({ data, history }) => {
                 <span className="metric-row-label">Sent</span>
                 <span className="metric-row-value">
                   {formatBytes(stats.bytes_sent)}
-                  {bandwidth && bandwidth[name] && (
+                  {stats.rates && stats.rates.bytes_sent_per_sec !== null && (
                     <span style={{ fontSize: '0.8rem', color: '#a0a0b0', marginLeft: '8px' }}>
-                      ({formatBytes(bandwidth[name].sent)}/s)
+                      ({formatBytes(stats.rates.bytes_sent_per_sec)}/s)
                     </span>
                   )}
                 </span>
@@ -144,9 +115,9 @@ const NetworkMetrics = ({ data, history }) => {
                 <span className="metric-row-label">Received</span>
                 <span className="metric-row-value">
                   {formatBytes(stats.bytes_recv)}
-                  {bandwidth && bandwidth[name] && (
+                  {stats.rates && stats.rates.bytes_recv_per_sec !== null && (
                     <span style={{ fontSize: '0.8rem', color: '#a0a0b0', marginLeft: '8px' }}>
-                      ({formatBytes(bandwidth[name].recv)}/s)
+                      ({formatBytes(stats.rates.bytes_recv_per_sec)}/s)
                     </span>
                   )}
                 </span>
@@ -182,13 +153,13 @@ const NetworkMetrics = ({ data, history }) => {
               <CartesianGrid strokeDasharray="3 3" stroke="#2a2a3e" />
               <XAxis dataKey="name" hide />
               <YAxis
-                tickFormatter={(value) => formatBytes(value)}
+                tickFormatter={(value) => `${formatBytes(value)}/s`}
                 width={70}
                 tick={{ fill: '#a0a0b0', fontSize: 12 }}
                 tickCount={5}
               />
               <Tooltip
-                formatter={(value) => formatBytes(value)}
+                formatter={(value) => `${formatBytes(value)}/s`}
                 labelFormatter={() => 'Network Traffic'}
                 contentStyle={{
                   backgroundColor: '#1e1e2f',
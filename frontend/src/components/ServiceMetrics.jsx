@@ -19,11 +19,32 @@ const ServiceMetrics = ({ data }) => {
     return 'status-inactive';
   };
 
+  const formatBytes = (bytes) => {
+    if (!bytes) return '0 B';
+    const sizes = ['B', 'KB', 'MB', 'GB', 'TB'];
+    const i = Math.max(0, Math.floor(Math.log(bytes) / Math.log(1024)));
+    return `${(bytes / Math.pow(1024, i)).toFixed(2)} ${sizes[i]}`;
+  };
+
+  const formatResources = (resources) => {
+    if (!resources) return null;
+    const parts = [];
+    if (resources.cpu_percent !== null) parts.push(`CPU ${resources.cpu_percent}%`);
+    if (resources.memory_bytes !== null) parts.push(`Mem ${formatBytes(resources.memory_bytes)}`);
+    if (resources.io_read_bytes_per_sec !== null && resources.io_write_bytes_per_sec !== null) {
+      parts.push(`IO ${formatBytes(resources.io_read_bytes_per_sec)}/s r, ${formatBytes(resources.io_write_bytes_per_sec)}/s w`);
+    }
+    return parts.length ? parts.join(' · ') : null;
+  };
+
   const renderServiceRow = (service) => (
     <div key={service.name} className="list-row">
       <div className="list-main">
         <div className="list-item-main">{service.name}</div>
         <div className="list-item-sub">{service.description || service.sub_state}</div>
+        {formatResources(service.resources) && (
+          <div className="list-item-sub">{formatResources(service.resources)}</div>
+        )}
       </div>
       <div className={`status-badge ${getStatusClass(service.active_state)}`}>
         {service.active_state}
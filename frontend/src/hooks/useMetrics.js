@@ -1,9 +1,10 @@
 /**
  * Custom hook for fetching and managing metrics data
- * Handles polling, error states, and historical data
+ * Handles streaming (with a polling fallback), error states, and historical data
  */
 import { useState, useEffect, useRef, useCallback } from 'react';
 import { metricsAPI } from '../services/api';
+import { applyPatch } from '../services/delta';
 
 const DEFAULT_INTERVAL = 3000; // 3 seconds
 const MAX_HISTORY_LENGTH = 60; // Keep last 60 data points (~3 minutes at 3s intervals)
@@ -18,60 +19,106 @@ export const useMetrics = (interval = DEFAULT_INTERVAL) => {
   const [isPaused, setIsPaused] = useState(false);
 
   const intervalRef = useRef(null);
+  const sourceRef = useRef(null);
+  const latestRef = useRef(null);
   const retryCountRef = useRef(0);
   const maxRetries = 5;
 
+  /**
+   * Apply a metrics payload (from the stream or a poll)
+   */
+  const handleMetrics = useCallback((data) => {
+    latestRef.current = data;
+    setMetrics(data);
+    setError(null);
+    setConnected(true);
+    setLastUpdated(new Date());
+    setLoading(false);
+    retryCountRef.current = 0;
+
+    // Add to history (circular buffer)
+    setHistory((prev) => {
+      const newHistory = [...prev, {
+        timestamp: Date.now(),
+        cpu: data.cpu,
+        memory: data.memory,
+        disk: data.disk,
+        network: data.network,
+      }];
+
+      // Keep only last MAX_HISTORY_LENGTH items
+      if (newHistory.length > MAX_HISTORY_LENGTH) {
+        return newHistory.slice(-MAX_HISTORY_LENGTH);
+      }
+      return newHistory;
+    });
+  }, []);
+
+  /**
+   * Record a failed fetch or a dropped stream
+   */
+  const handleError = useCallback((message) => {
+    setError(message);
+    setConnected(false);
+    retryCountRef.current += 1;
+
+    // Exponential backoff for retries
+    if (retryCountRef.current >= maxRetries) {
+      setError('Connection lost. Please check if the backend is running.');
+    }
+  }, []);
+
   /**
    * Fetch metrics from API
    */
   const fetchMetrics = useCallback(async () => {
     try {
       const data = await metricsAPI.getAllMetrics();
-
-      setMetrics(data);
-      setError(null);
-      setConnected(true);
-      setLastUpdated(new Date());
-      setLoading(false);
-      retryCountRef.current = 0;
-
-      // Add to history (circular buffer)
-      setHistory((prev) => {
-        const newHistory = [...prev, {
-          timestamp: Date.now(),
-          cpu: data.cpu,
-          memory: data.memory,
-          disk: data.disk,
-          network: data.network,
-        }];
-
-        // Keep only last MAX_HISTORY_LENGTH items
-        if (newHistory.length > MAX_HISTORY_LENGTH) {
-          return newHistory.slice(-MAX_HISTORY_LENGTH);
-        }
-        return newHistory;
-      });
-
+      handleMetrics(data);
     } catch (err) {
       console.error('Failed to fetch metrics:', err);
-      setError(err.message || 'Failed to fetch metrics');
-      setConnected(false);
-      retryCountRef.current += 1;
-
-      // Exponential backoff for retries
-      if (retryCountRef.current >= maxRetries) {
-        setError('Connection lost. Please check if the backend is running.');
-      }
+      handleError(err.message || 'Failed to fetch metrics');
     }
-  }, []);
+  }, [handleMetrics, handleError]);
 
   /**
-   * Start polling
+   * Start receiving updates: the snapshot stream when supported, polling otherwise
    */
   const startPolling = useCallback(() => {
     if (intervalRef.current) {
       clearInterval(intervalRef.current);
     }
+    if (sourceRef.current) {
+      sourceRef.current.close();
+      sourceRef.current = null;
+    }
+
+    if (typeof window !== 'undefined' && window.EventSource) {
+      if (isPaused) {
+        return;
+      }
+      // The browser reconnects on its own and resumes from the last event id
+      const source = new EventSource(metricsAPI.getStreamURL(interval / 1000, true));
+      source.addEventListener('metrics', (event) => {
+        handleMetrics(JSON.parse(event.data));
+      });
+      source.addEventListener('patch', (event) => {
+        const message = JSON.parse(event.data);
+        const latest = latestRef.current;
+        if (!latest || latest.seq !== message.base) {
+          // Out of step; reconnecting without a usable base yields a keyframe
+          latestRef.current = null;
+          startPolling();
+          return;
+        }
+        handleMetrics({ ...applyPatch(latest, message.patch), seq: message.seq });
+      });
+      source.onerror = () => {
+        handleError('Metrics stream interrupted');
+      };
+      sourceRef.current = source;
+      return;
+    }
 
     // Fetch immediately
     fetchMetrics();
@@ -82,7 +129,7 @@ export const useMetrics = (interval = DEFAULT_INTERVAL) => {
         fetchMetrics();
       }
     }, interval);
-  }, [interval, isPaused, fetchMetrics]);
+  }, [interval, isPaused, fetchMetrics, handleMetrics, handleError]);
 
   /**
    * Stop polling
@@ -92,6 +139,10 @@ export const useMetrics = (interval = DEFAULT_INTERVAL) => {
       clearInterval(intervalRef.current);
       intervalRef.current = null;
     }
+    if (sourceRef.current) {
+      sourceRef.current.close();
+      sourceRef.current = null;
+    }
   }, []);
 
   /**
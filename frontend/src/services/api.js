@@ -57,8 +57,9 @@ api.interceptors.response.use(
 export const metricsAPI = {
   /**
    * Get all metrics in a single call
+   * @param {string} fields - Optional comma-separated paths to return, e.g. 'cpu.usage_percent,memory.percent'
    */
-  getAllMetrics: () => api.get('/api/v1/metrics/all'),
+  getAllMetrics: (fields) => api.get('/api/v1/metrics/all', { params: { fields } }),
 
   /**
    * Get CPU metrics
@@ -80,6 +81,22 @@ export const metricsAPI = {
    */
   getNetworkMetrics: () => api.get('/api/v1/metrics/network'),
 
+  /**
+   * URL of the Server-Sent Events snapshot stream
+   * @param {number} intervalSeconds - Minimum seconds between delivered updates
+   * @param {boolean} delta - Receive patches between full keyframes
+   */
+  getStreamURL: (intervalSeconds = 0, delta = false) => (
+    `${getBaseURL()}/api/v1/metrics/stream?interval=${intervalSeconds}${delta ? '&delta=1' : ''}`
+  ),
+
+  /**
+   * Get stored history for one metric
+   */
+  getHistory: (metric, params = {}) => api.get('/api/v1/metrics/history', {
+    params: { metric, ...params },
+  }),
+
   /**
    * Health check
    */
@@ -95,8 +112,9 @@ export const systemAPI = {
 
   /**
    * Get process metrics
+   * @param {Object} params - Optional query ({ sort, user, name, limit, offset }) for a page of the full process table
    */
-  getProcesses: () => api.get('/api/v1/system/processes'),
+  getProcesses: (params) => api.get('/api/v1/system/processes', { params }),
 
   /**
    * Get service metrics
@@ -0,0 +1,50 @@
+/**
+ * Delta payload helpers
+ * Applies the compact patches produced by the backend delta encoder
+ */
+
+const unescapeKey = (key) => key.replace(/~1/g, '/').replace(/~0/g, '~');
+
+/**
+ * Apply a patch to a payload without mutating it
+ * @param {Object} document - Last full payload
+ * @param {Array} patch - List of [path, value] (set) or [path] (remove) ops
+ * @returns {Object} New payload sharing unchanged branches with the old one
+ */
+export const applyPatch = (document, patch) => {
+  let result = document;
+
+  patch.forEach((op) => {
+    const [path] = op;
+    if (path === '') {
+      result = op[1];
+      return;
+    }
+
+    const keys = path.split('/').slice(1).map(unescapeKey);
+    const root = Array.isArray(result) ? [...result] : { ...result };
+    let node = root;
+
+    keys.slice(0, -1).forEach((key) => {
+      const child = node[key];
+      node[key] = Array.isArray(child) ? [...child] : { ...child };
+      node = node[key];
+    });
+
+    const last = keys[keys.length - 1];
+    if (op.length === 1) {
+      if (Array.isArray(node)) {
+        node.splice(Number(last), 1);
+      } else {
+        delete node[last];
+      }
+    } else {
+      node[last] = op[1];
+    }
+    result = root;
+  });
+
+  return result;
+};
+
+export default applyPatch;